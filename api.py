@@ -0,0 +1,135 @@
+import json
+from datetime import datetime, timedelta
+
+from flask import Blueprint, Response, abort, current_app, jsonify, request
+
+from models import db, Venue, Artist
+from queries import (VENUE_COLUMNS, ARTIST_COLUMNS, SHOW_FEED_COLUMNS,
+                     VENUE_DETAIL_FIELDS, ARTIST_DETAIL_FIELDS,
+                     shows_page, entity_page, venue_detail, artist_detail, venue_free_slots)
+
+try:
+    import orjson
+except ImportError:  # optional; falls back to the stdlib encoder
+    orjson = None
+
+
+api = Blueprint('api', __name__, url_prefix='/api/v1')
+
+
+#----------------------------------------------------------------------------#
+# Helpers.
+#----------------------------------------------------------------------------#
+
+def _default(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload):
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default)
+    return json.dumps(payload, separators=(',', ':'), default=_default)
+
+
+def json_response(payload, status=200):
+    return Response(dumps(payload), status=status, mimetype='application/json')
+
+
+def requested_fields(available):
+    """Validate ?fields=a,b against `available`; default to all of them."""
+    fields = request.args.get('fields')
+    if not fields:
+        return list(available)
+    fields = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in available]
+    if unknown:
+        abort(400, description=f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def page_limit():
+    limit = request.args.get('limit', current_app.config['API_PAGE_SIZE'], type=int)
+    return max(1, min(limit, current_app.config['API_PAGE_SIZE_MAX']))
+
+
+def _listing(model, columns):
+    fields = requested_fields(columns)
+    cursor = request.args.get('cursor')
+    if cursor is not None and not cursor.isdigit():
+        abort(400, description="Invalid cursor")
+    data, next_cursor = entity_page(model, {key: columns[key] for key in fields},
+                                    cursor, page_limit())
+    return json_response({"data": data, "next_cursor": next_cursor})
+
+
+def _detail(detail, entity_id, available):
+    """One venue or artist, loading only the ?fields= requested."""
+    fields = requested_fields(available)
+    data = detail(entity_id, fields)
+    if data is None:
+        abort(404)
+    return json_response({"data": {key: data[key] for key in fields}})
+
+
+#----------------------------------------------------------------------------#
+# Routes.
+#----------------------------------------------------------------------------#
+
+@api.route('/venues')
+def venues():
+    return _listing(Venue, VENUE_COLUMNS)
+
+
+@api.route('/venues/<int:venue_id>')
+def venue(venue_id):
+    return _detail(venue_detail, venue_id, VENUE_DETAIL_FIELDS)
+
+
+@api.route('/venues/<int:venue_id>/free-slots')
+def venue_free_slots_in_week(venue_id):
+    """Gaps between a venue's shows in ?week=YYYY-Www (default: this week)
+    lasting at least ?min_minutes (default 60)."""
+    week = request.args.get('week')
+    try:
+        start = datetime.strptime(week + '-1', '%G-W%V-%u') if week else None
+    except ValueError:
+        abort(400, description="Expected week as YYYY-Www")
+    if start is None:
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        start = today - timedelta(days=today.weekday())
+    min_minutes = max(1, request.args.get('min_minutes', 60, type=int))
+    if db.session.query(Venue.id).filter(Venue.id == venue_id).first() is None:
+        abort(404)
+    slots = venue_free_slots(venue_id, start, start + timedelta(days=7), min_minutes)
+    return json_response({"data": [{"start": free_from, "end": free_to}
+                                   for free_from, free_to in slots]})
+
+
+@api.route('/artists')
+def artists():
+    return _listing(Artist, ARTIST_COLUMNS)
+
+
+@api.route('/artists/<int:artist_id>')
+def artist(artist_id):
+    return _detail(artist_detail, artist_id, ARTIST_DETAIL_FIELDS)
+
+
+@api.route('/shows')
+def shows():
+    fields = requested_fields(SHOW_FEED_COLUMNS)
+    upcoming_only = request.args.get('all') != '1'
+    try:
+        data, next_cursor = shows_page(request.args.get('cursor'), page_limit(),
+                                       upcoming_only, fields)
+    except ValueError:
+        abort(400, description="Invalid cursor")
+    return json_response({"data": data, "next_cursor": next_cursor})
+
+
+@api.errorhandler(400)
+@api.errorhandler(404)
+def api_error(error):
+    return jsonify(error=error.description), error.code
@@ -0,0 +1,155 @@
+from flask import Blueprint, abort, current_app, flash, make_response, redirect, render_template, request, url_for
+
+from autocomplete import name_indexes
+from cache import render_cache, cached_render, artist_page_keys
+from conditional import make_etag, last_modified_from, is_not_modified, add_validators
+from facets import facet_links, selected_genres
+from forms import ArtistForm
+from models import db, Artist
+from queries import artist_list, artist_detail, search, artist_page_version
+
+
+bp = Blueprint('artists', __name__)
+
+
+#  ----------------------------------------------------------------
+#  Artists
+#  ----------------------------------------------------------------
+@bp.route('/artists')
+def artists():
+    genres = selected_genres()
+    data = artist_list(genres)
+    facets = facet_links('artists.artists', Artist, genres)
+    return render_template('pages/artists.html', artists=data, facets=facets)
+
+ 
+@bp.route('/artists/search', methods=['POST'])
+def search_artists():
+    search_term = request.form.get('search_term', '')
+    response = search(Artist, search_term, current_app.config['SEARCH_RESULT_LIMIT'],
+                      current_app.config['SHOW_STATS_MAX_AGE'])
+    return render_template('pages/search_artists.html', results=response, search_term=search_term)
+
+ 
+@bp.route('/artists/<int:artist_id>')
+def show_artist(artist_id):
+    version = artist_page_version(artist_id)
+    if version is None:
+        abort(404)
+    etag = make_etag('artist', artist_id, version)
+    last_modified = last_modified_from(version)
+    if is_not_modified(etag, last_modified):
+        return add_validators(make_response('', 304), etag, last_modified)
+
+    def render():
+        data = artist_detail(artist_id)
+        if data is None:
+            abort(404)
+        return render_template('pages/show_artist.html', artist=data)
+
+    html, cache_status = cached_render(('artist', artist_id, etag), render)
+    response = make_response(html)
+    response.headers['X-Render-Cache'] = cache_status
+    return add_validators(response, etag, last_modified)
+
+
+#  ----------------------------------------------------------------
+#  Update
+#  ----------------------------------------------------------------
+@bp.route('/artists/<int:artist_id>/edit', methods=['GET'])
+def edit_artist(artist_id):
+    data = Artist.query.get(artist_id)
+    artist = {
+        "id": data.id,
+        "name": data.name,
+        "genres": data.genres,
+        "city": data.city,
+        "state": data.state,
+        "phone": data.phone,
+        "website": data.website_link,
+        "facebook_link": data.facebook_link,
+        "seeking_venue": data.seeking_venue,
+        "seeking_description": data.seeking_description,
+        "image_link": data.image_link,
+    }
+    
+    form = ArtistForm(formdata=None, data=artist)
+    return render_template('forms/edit_artist.html', form=form, artist=artist)
+
+
+@bp.route('/artists/<int:artist_id>/edit', methods=['POST'])
+def edit_artist_submission(artist_id):
+    form = ArtistForm(request.form)
+    if form.validate():
+        try:
+        
+            artist = Artist.query.get(artist_id)
+            artist.name = form.name.data
+            artist.city=form.city.data
+            artist.state=form.state.data
+            artist.phone=form.phone.data
+            artist.genres=form.genres.data 
+            artist.facebook_link=form.facebook_link.data
+            artist.image_link=form.image_link.data
+            artist.seeking_venue=form.seeking_venue.data
+            artist.seeking_description=form.seeking_description.data
+            artist.website_link=form.website_link.data
+
+            db.session.add(artist)
+            db.session.commit()
+            render_cache.invalidate(*artist_page_keys(artist_id))
+            name_indexes['artists'].add(artist.id, artist.name)
+            flash("Artist " + artist.name + " was successfully edited!")
+        except:
+            db.session.rollback()
+            flash("An error occurred. Artist " + artist.name + " could not be listed")
+        finally:
+            db.session.close()
+    else:
+        print("\n\n", form.errors)
+        flash("Artist was not edited successfully.")
+
+    return redirect(url_for('artists.show_artist', artist_id=artist_id))
+
+   
+    
+#  ---------------------------------------------------------------- 
+#  Create Artist
+#  ----------------------------------------------------------------
+
+@bp.route('/artists/create', methods=['GET'])
+def create_artist_form():
+    form = ArtistForm()
+    return render_template('forms/new_artist.html', form=form)
+
+@bp.route('/artists/create', methods=['POST'])
+def create_artist_submission():
+    form = ArtistForm(request.form)
+    if form.validate():
+        try:
+            artist = Artist(
+                name=form.name.data,
+                city=form.city.data,
+                state=form.state.data,
+                phone=form.phone.data,
+                genres=form.genres.data,
+                facebook_link=form.facebook_link.data,
+                image_link=form.image_link.data,
+                website_link=form.website_link.data,
+                seeking_venue=form.seeking_venue.data,
+                seeking_description=form.seeking_description.data
+        )
+            db.session.add(artist)
+            db.session.commit()
+            name_indexes['artists'].add(artist.id, artist.name)
+            flash('Artist ' + request.form['name'] + ' was successfully listed!')
+        except:
+            db.session.rollback()
+            flash('An error occurred. Artist ' + request.form['name'] + ' could not be listed.')
+        finally:
+            db.session.close()
+    else:
+        print("\n\n", form.errors)
+        flash("Artist was not successfully listed.")
+            
+    return render_template('pages/home.html')
@@ -0,0 +1,146 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+
+from flask import abort, request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # optional; only gzip variants are built without it
+    brotli = None
+
+try:
+    import rjsmin
+except ImportError:  # optional; JS is concatenated as-is without it
+    rjsmin = None
+
+
+# Bundles in load order. Stylesheet url()s are relative to static/css, and
+# the bundles are written to static/dist, so they resolve unchanged.
+BUNDLES = {
+    'main.css': [
+        'css/bootstrap.min.css',
+        'css/layout.main.css',
+        'css/main.css',
+        'css/main.responsive.css',
+        'css/main.quickfix.css',
+    ],
+    # Loaded synchronously in <head>, like the individual files were.
+    'head.js': [
+        'js/libs/modernizr-2.8.2.min.js',
+        'js/libs/moment.min.js',
+    ],
+    # Deferred, so it runs after jQuery has loaded at the end of <body>.
+    'app.js': [
+        'js/script.js',
+        'js/libs/bootstrap-3.1.1.min.js',
+        'js/plugins.js',
+    ],
+}
+
+DIST = 'dist'
+MANIFEST = 'manifest.json'
+IMMUTABLE = 'public, max-age=31536000, immutable'
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+_SOURCE_MAP = re.compile(r'^\s*(//|/\*)[#@] sourceMappingURL=.*$', re.MULTILINE)
+
+
+#----------------------------------------------------------------------------#
+# Build.
+#----------------------------------------------------------------------------#
+
+def minify_css(source):
+    source = re.sub(r'/\*.*?\*/', '', source, flags=re.DOTALL)
+    source = re.sub(r'\s+', ' ', source)
+    source = re.sub(r'\s*([{};,>])\s*', r'\1', source)
+    return source.replace(';}', '}').strip()
+
+
+def minify_js(source):
+    return rjsmin.jsmin(source) if rjsmin is not None else source
+
+
+def build(static_folder):
+    """Bundle, minify, fingerprint and precompress BUNDLES into static/dist.
+
+    Returns the manifest mapping each bundle name to its hashed filename.
+    """
+    dist = os.path.join(static_folder, DIST)
+    os.makedirs(dist, exist_ok=True)
+    manifest = {}
+    for name, sources in BUNDLES.items():
+        parts = []
+        for source in sources:
+            with open(os.path.join(static_folder, source), encoding='utf-8') as f:
+                parts.append(_SOURCE_MAP.sub('', f.read()))
+        if name.endswith('.css'):
+            content = '\n'.join(minify_css(part) for part in parts)
+        else:
+            # Separate files with ';' so a missing trailing semicolon in one
+            # library cannot merge two statements.
+            content = '\n;'.join(minify_js(part) for part in parts)
+        data = content.encode('utf-8')
+
+        stem, ext = os.path.splitext(name)
+        hashed = f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+        path = os.path.join(dist, hashed)
+        with open(path, 'wb') as f:
+            f.write(data)
+        with open(path + '.gz', 'wb') as f:
+            f.write(gzip.compress(data, compresslevel=9, mtime=0))
+        if brotli is not None:
+            with open(path + '.br', 'wb') as f:
+                f.write(brotli.compress(data, quality=11))
+        manifest[name] = hashed
+
+    with open(os.path.join(dist, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+#----------------------------------------------------------------------------#
+# Serving.
+#----------------------------------------------------------------------------#
+
+def init_app(app):
+    """Serve built bundles and expose asset_url() to templates.
+
+    asset_url(name) returns the fingerprinted URL of a bundle, or None when
+    `flask build-assets` has not been run, in which case templates fall
+    back to the individual files.
+    """
+    dist = os.path.join(app.static_folder, DIST)
+    manifest = {}
+    try:
+        with open(os.path.join(dist, MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    @app.context_processor
+    def asset_helpers():
+        def asset_url(name):
+            hashed = manifest.get(name)
+            return f"{app.static_url_path}/{DIST}/{hashed}" if hashed else None
+        return {'asset_url': asset_url}
+
+    @app.route(f'{app.static_url_path}/{DIST}/<path:filename>')
+    def dist_asset(filename):
+        if filename not in manifest.values():
+            abort(404)
+        mimetype = mimetypes.guess_type(filename)[0]
+        accepted = request.accept_encodings
+        for encoding, suffix in ENCODINGS:
+            if accepted[encoding] and os.path.exists(os.path.join(dist, filename + suffix)):
+                response = send_from_directory(dist, filename + suffix, mimetype=mimetype)
+                response.headers['Content-Encoding'] = encoding
+                break
+        else:
+            response = send_from_directory(dist, filename, mimetype=mimetype)
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Cache-Control'] = IMMUTABLE
+        return response
@@ -0,0 +1,176 @@
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+
+from flask import abort, current_app, request
+
+from api import api, json_response
+from models import db, Venue, Artist
+
+
+#----------------------------------------------------------------------------#
+# Prefix index.
+#----------------------------------------------------------------------------#
+
+def normalize(text):
+    return ' '.join(text.casefold().split())
+
+
+def word_suffixes(name):
+    """Keys for `name`: the normalized name from the start of each word.
+
+    "The Blue Owl" is indexed as "the blue owl", "blue owl" and "owl", so
+    typing any word of a name finds it.
+    """
+    name = normalize(name)
+    starts = [0] + [i + 1 for i, char in enumerate(name) if char == ' ']
+    return [name[start:] for start in starts]
+
+
+class PrefixIndex:
+    """Sorted array of (key, id) over a model's names, searched with bisect.
+
+    A lookup is one binary search plus a scan of at most `limit` matches
+    per word, so it stays well under a millisecond at hundreds of thousands
+    of names. Like the render cache, the index is per process: it is
+    loaded on first use, kept current by the create/edit/delete routes of
+    the worker that served them, and reloaded every
+    AUTOCOMPLETE_REBUILD_SECONDS so other workers (and bulk imports)
+    converge.
+
+    Inserting into the big arrays would move every entry after the key,
+    once per word of the name, so edits are batched instead: new keys go
+    to a small sorted pending list, the old keys of a renamed or removed
+    id are skipped until the next merge, and searches read both. Once the
+    pending list outgrows PENDING_LIMIT keys and a PENDING_SHARE of the
+    index, it is merged in with one sort of the two runs.
+    """
+
+    PENDING_LIMIT = 1000
+    PENDING_SHARE = 1 / 16
+
+    def __init__(self, model):
+        self.model = model
+        self.built_at = None
+        self._keys = []
+        self._ids = []
+        self._names = {}
+        self._pending = []
+        self._stale = set()
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+    def load(self, rows):
+        names = dict(rows)
+        pairs = sorted((key, id) for id, name in names.items() for key in word_suffixes(name))
+        keys = [key for key, _ in pairs]
+        ids = [id for _, id in pairs]
+        with self._lock:
+            self._keys, self._ids, self._names = keys, ids, names
+            self._pending, self._stale = [], set()
+            self.built_at = time.monotonic()
+
+    def ensure_fresh(self, max_age):
+        if self.built_at is not None and time.monotonic() - self.built_at < max_age:
+            return
+        # Only the first load blocks; during a reload other requests keep
+        # searching the current index.
+        if not self._build_lock.acquire(blocking=self.built_at is None):
+            return
+        try:
+            # Another thread may have loaded it while this one waited.
+            if self.built_at is None or time.monotonic() - self.built_at >= max_age:
+                self.load(db.session.query(self.model.id, self.model.name))
+        finally:
+            self._build_lock.release()
+
+    def add(self, id, name):
+        """Insert or rename `id`; a no-op until the index is first loaded."""
+        with self._lock:
+            if self.built_at is None:
+                return
+            self._discard(id)
+            self._names[id] = name
+            for key in word_suffixes(name):
+                insort(self._pending, (key, id))
+            if len(self._pending) > max(self.PENDING_LIMIT, len(self._keys) * self.PENDING_SHARE):
+                self._merge_pending()
+
+    def remove(self, id):
+        with self._lock:
+            self._discard(id)
+
+    def _discard(self, id):
+        name = self._names.pop(id, None)
+        if name is None:
+            return
+        # Its keys in the big arrays, if any, are dropped at the next merge.
+        self._stale.add(id)
+        for key in word_suffixes(name):
+            i = bisect_left(self._pending, (key, id))
+            if i < len(self._pending) and self._pending[i] == (key, id):
+                del self._pending[i]
+
+    def _merge_pending(self):
+        current = [(key, id) for key, id in zip(self._keys, self._ids) if id not in self._stale]
+        # Both runs are sorted, so this sort only merges them.
+        merged = sorted(current + self._pending)
+        self._keys = [key for key, _ in merged]
+        self._ids = [id for _, id in merged]
+        self._pending, self._stale = [], set()
+
+    def _matches(self, prefix):
+        """(key, id) pairs whose key starts with `prefix`, in order."""
+        i = bisect_left(self._keys, prefix)
+        while i < len(self._keys) and self._keys[i].startswith(prefix):
+            if self._ids[i] not in self._stale:
+                yield self._keys[i], self._ids[i]
+            i += 1
+
+    def _pending_matches(self, prefix):
+        i = bisect_left(self._pending, (prefix,))
+        while i < len(self._pending) and self._pending[i][0].startswith(prefix):
+            yield self._pending[i]
+            i += 1
+
+    def search(self, prefix, limit):
+        """Up to `limit` (id, name) pairs with a word starting with `prefix`."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        matches = []
+        seen = set()
+        with self._lock:
+            for _, id in heapq.merge(self._matches(prefix), self._pending_matches(prefix)):
+                if id not in seen:
+                    seen.add(id)
+                    matches.append((id, self._names[id]))
+                    if len(matches) == limit:
+                        break
+        return matches
+
+    def __len__(self):
+        return len(self._names)
+
+
+name_indexes = {
+    'venues': PrefixIndex(Venue),
+    'artists': PrefixIndex(Artist),
+}
+
+
+#----------------------------------------------------------------------------#
+# Routes.
+#----------------------------------------------------------------------------#
+
+@api.route('/autocomplete/<entity>')
+def autocomplete(entity):
+    index = name_indexes.get(entity)
+    if index is None:
+        abort(404)
+    limit = request.args.get('limit', current_app.config['AUTOCOMPLETE_LIMIT'], type=int)
+    limit = max(1, min(limit, current_app.config['AUTOCOMPLETE_LIMIT_MAX']))
+    index.ensure_fresh(current_app.config['AUTOCOMPLETE_REBUILD_SECONDS'])
+    matches = index.search(request.args.get('q', ''), limit)
+    return json_response({"data": [{"id": id, "name": name} for id, name in matches]})
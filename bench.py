@@ -0,0 +1,500 @@
+"""Route load benchmark.
+
+Drives every read route through the Flask test client against whatever the
+configured database holds (see `flask seed`) and reports p50/p95/p99
+latency, throughput and SQL statements per request. Startup cost (importing
+the app in a fresh interpreter, then serving the first request) is measured
+separately. Results are written as JSON keyed by commit so runs can be
+compared:
+
+    python bench.py --iterations 200 --output bench_results
+
+Each JSON route is also compared with the HTML page that shows the same
+data (the api_vs_html section), as requests per second of each.
+
+--startup-baseline REVISION also times startup at another commit (checked
+out in a temporary git worktree), e.g. the one before the app factory:
+
+    python bench.py --startup-runs 10 --startup-baseline e6331f7^
+
+--history-steps N appends N batches of past shows to the database and
+times the upcoming-shows query after each one; with shows partitioned by
+month its latency should stay flat as history grows.
+
+The report also records the on-disk size of the venue and artist tables
+and their indexes, to compare storage changes across commits.
+
+--import-rows N [N ...] writes N seeded venues, artists and shows to
+NDJSON files and times `flask import`'s import_file() on each, in rows per
+second. The imported rows stay, so run it against a scratch database.
+
+--datetime-shows N times formatting the start times of an N-show page the
+way format_datetime first did it (str() then dateutil and babel on every
+call) against filters.format_datetime, cold and with its caches warm.
+
+--areas compares building the /venues areas the way the app first did it
+(one query per area and per venue) with venue_areas(): statements per
+build should go from 1 + areas + venues to one.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import bindparam, event, func, text
+from sqlalchemy.engine import Engine
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+@contextmanager
+def counted_statements():
+    """Count the statements sent to any engine; read the count from [0]."""
+    statements = [0]
+
+    def count(*args):
+        statements[0] += 1
+
+    event.listen(Engine, 'before_cursor_execute', count)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, 'before_cursor_execute', count)
+
+
+def timed(function, iterations):
+    """(result, p50 seconds, statements per call) of calling `function`."""
+    latencies = []
+    with counted_statements() as statements:
+        for _ in range(iterations):
+            t0 = time.perf_counter()
+            result = function()
+            latencies.append(time.perf_counter() - t0)
+    return result, percentile(latencies, 50), statements[0] / iterations
+
+
+def routes(db, Venue, Artist):
+    venue_id = db.session.query(func.min(Venue.id)).scalar()
+    artist_id = db.session.query(func.min(Artist.id)).scalar()
+    paths = [
+        ('index', 'GET', '/', None),
+        ('venues', 'GET', '/venues', None),
+        ('artists', 'GET', '/artists', None),
+        ('venues_genre', 'GET', '/venues?genre=Jazz', None),
+        ('artists_genres', 'GET', '/artists?genre=Jazz&genre=Rock n Roll', None),
+        ('shows', 'GET', '/shows', None),
+        ('shows_all', 'GET', '/shows?all=1', None),
+        ('search_venues', 'POST', '/venues/search', {'search_term': 'blue'}),
+        ('search_artists', 'POST', '/artists/search', {'search_term': 'blue'}),
+        ('create_venue_form', 'GET', '/venues/create', None),
+        ('create_artist_form', 'GET', '/artists/create', None),
+        ('create_shows', 'GET', '/shows/create', None),
+        ('api_venues', 'GET', '/api/v1/venues', None),
+        ('api_artists', 'GET', '/api/v1/artists', None),
+        ('api_shows', 'GET', '/api/v1/shows', None),
+        ('autocomplete_artists', 'GET', '/api/v1/autocomplete/artists?q=blue', None),
+        ('autocomplete_venues', 'GET', '/api/v1/autocomplete/venues?q=the', None),
+    ]
+    if venue_id is not None:
+        paths += [
+            ('show_venue', 'GET', f'/venues/{venue_id}', None),
+            ('edit_venue', 'GET', f'/venues/{venue_id}/edit', None),
+            ('api_venue', 'GET', f'/api/v1/venues/{venue_id}', None),
+        ]
+    if artist_id is not None:
+        paths += [
+            ('show_artist', 'GET', f'/artists/{artist_id}', None),
+            ('edit_artist', 'GET', f'/artists/{artist_id}/edit', None),
+            ('api_artist', 'GET', f'/api/v1/artists/{artist_id}', None),
+        ]
+    return paths
+
+
+SIZED_RELATIONS = (
+    'Venue', 'Artist',
+    'ix_venue_genres', 'ix_artist_genres',
+    'ix_venue_search_vector', 'ix_artist_search_vector',
+)
+
+
+def relation_sizes():
+    """Bytes on disk for each of SIZED_RELATIONS that exists."""
+    from app import app
+    from models import db
+
+    with app.app_context():
+        rows = db.session.execute(text(
+            "SELECT relname, pg_relation_size(oid) FROM pg_class WHERE relname IN :names"
+        ).bindparams(bindparam('names', expanding=True)), {'names': list(SIZED_RELATIONS)})
+        sizes = dict(rows.all())
+    for name, size in sorted(sizes.items()):
+        print(f"{name:28} {size / 1024:12.1f} KiB")
+    return sizes
+
+
+def run(iterations, warmup, cold):
+    from app import app
+    from cache import render_cache
+    from models import db, Venue, Artist
+
+    client = app.test_client()
+    with app.app_context():
+        paths = routes(db, Venue, Artist)
+
+    results = {}
+    for name, method, path, data in paths:
+        for _ in range(warmup):
+            client.open(path, method=method, data=data)
+        latencies = []
+        status = None
+        started = time.perf_counter()
+        with counted_statements() as statements:
+            for _ in range(iterations):
+                if cold:
+                    render_cache.clear()
+                t0 = time.perf_counter()
+                status = client.open(path, method=method, data=data).status_code
+                latencies.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - started
+        results[name] = {
+            'method': method,
+            'path': path,
+            'status': status,
+            'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+            'mean_ms': round(statistics.mean(latencies) * 1000, 3),
+            'throughput_rps': round(iterations / elapsed, 1),
+            'queries_per_request': round(statements[0] / iterations, 2),
+        }
+        print(f"{name:20} p50={results[name]['p50_ms']:8.2f}ms p95={results[name]['p95_ms']:8.2f}ms "
+              f"p99={results[name]['p99_ms']:8.2f}ms {results[name]['throughput_rps']:8.1f} rps "
+              f"{results[name]['queries_per_request']:6.2f} q/req")
+    return results
+
+
+# (JSON route, HTML page serving the same data) from routes().
+API_HTML_PAIRS = (
+    ('api_venues', 'venues'),
+    ('api_artists', 'artists'),
+    ('api_shows', 'shows'),
+    ('api_venue', 'show_venue'),
+    ('api_artist', 'show_artist'),
+)
+
+
+def api_vs_html(results):
+    """Throughput of each JSON route against its HTML page."""
+    comparison = {}
+    for api_name, html_name in API_HTML_PAIRS:
+        if api_name not in results or html_name not in results:
+            continue
+        api_rps = results[api_name]['throughput_rps']
+        html_rps = results[html_name]['throughput_rps']
+        comparison[api_name] = {
+            'html': html_name,
+            'api_rps': api_rps,
+            'html_rps': html_rps,
+            'api_over_html': round(api_rps / html_rps, 2),
+        }
+        print(f"{api_name + ' vs html':20} api={api_rps:8.1f} rps html={html_rps:8.1f} rps "
+              f"x{comparison[api_name]['api_over_html']:.2f}")
+    return comparison
+
+
+STARTUP_PROBE = """
+import time
+started = time.perf_counter()
+from app import app
+imported = time.perf_counter()
+app.test_client().get('/')
+print(imported - started, time.perf_counter() - imported)
+"""
+
+
+def startup(runs, cwd=None, label='startup'):
+    """Import time and time to first response, each in a fresh interpreter.
+
+    `cwd` is the checkout to import the app from; by default this one.
+    """
+    imports, first_requests = [], []
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, '-c', STARTUP_PROBE], text=True, cwd=cwd)
+        import_seconds, first_seconds = map(float, output.split()[-2:])
+        imports.append(import_seconds)
+        first_requests.append(first_seconds)
+    result = {
+        'runs': runs,
+        'import_ms': round(statistics.median(imports) * 1000, 3),
+        'first_request_ms': round(statistics.median(first_requests) * 1000, 3),
+    }
+    print(f"{label:20} import={result['import_ms']:8.2f}ms first request={result['first_request_ms']:8.2f}ms")
+    return result
+
+
+def startup_baseline(runs, revision):
+    """startup() for `revision`, checked out in a temporary git worktree.
+
+    The probe only needs `from app import app`, which every layout of the
+    app has provided, so any commit can serve as the baseline.
+    """
+    directory = tempfile.mkdtemp(prefix='fyyur-baseline-')
+    subprocess.check_call(['git', 'worktree', 'add', '--detach', directory, revision],
+                          stdout=subprocess.DEVNULL)
+    try:
+        result = startup(runs, cwd=directory, label=f'startup@{revision}')
+    finally:
+        subprocess.check_call(['git', 'worktree', 'remove', '--force', directory])
+    result['revision'] = revision
+    return result
+
+
+def history(steps, rows_per_step, iterations):
+    """Latency of the upcoming-shows query as past shows are appended.
+
+    This writes to the configured database.
+    """
+    from app import app
+    from models import db, Venue, Artist, Show
+    from partitions import ensure_partitions
+    from queries import shows_page
+    import seed
+
+    rng = random.Random(0)
+    # show_rows spreads shows over four years ending a year after `now`;
+    # shifting it back a year keeps every added show in the past.
+    past = datetime.now() - timedelta(days=365)
+    results = []
+    with app.app_context():
+        venue_ids = [id for id, in db.session.query(Venue.id).order_by(Venue.id)]
+        artist_ids = [id for id, in db.session.query(Artist.id).order_by(Artist.id)]
+        if not (venue_ids and artist_ids):
+            raise SystemExit("Seed venues and artists first (flask seed).")
+        ensure_partitions(0, since=past - timedelta(days=3 * 365))
+        booked = {}
+        for step in range(steps + 1):
+            if step:
+                seed._insert(Show, seed.show_rows(rng, rows_per_step, venue_ids, artist_ids, past, booked),
+                             seed.BATCH_ROWS, skip_conflicts=True)
+            total = db.session.query(func.count(Show.id)).scalar()
+            latencies = []
+            for _ in range(iterations):
+                t0 = time.perf_counter()
+                shows_page(None, 30, True)
+                latencies.append(time.perf_counter() - t0)
+                db.session.rollback()
+            results.append({
+                'shows': total,
+                'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+                'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+            })
+            print(f"{'upcoming_shows':20} shows={total:>10} p50={results[-1]['p50_ms']:8.2f}ms "
+                  f"p95={results[-1]['p95_ms']:8.2f}ms")
+    return results
+
+
+def imports(row_counts):
+    """Rows per second through importer.import_file() for each entity and size.
+
+    This appends to the configured database; deleting a million venues
+    again would cost one foreign key probe per shows partition per row.
+    Each size's shows get their own four years, starting two years ahead,
+    so they never collide with seeded shows or each other.
+    """
+    from app import app
+    from models import db, Venue, Artist
+    from partitions import ensure_partitions
+    import importer
+    import seed
+
+    def shows(rng, count):
+        years_ahead = 6 + 4 * row_counts.index(count)
+        ensure_partitions(12 * years_ahead + 1)
+        later = datetime.now() + timedelta(days=(years_ahead - 1) * 365)
+        return seed.show_rows(rng, count, venue_ids, artist_ids, later)
+
+    results = {}
+    with app.app_context(), tempfile.TemporaryDirectory() as directory:
+        venue_ids = [id for id, in db.session.query(Venue.id).order_by(Venue.id)]
+        artist_ids = [id for id, in db.session.query(Artist.id).order_by(Artist.id)]
+        if not (venue_ids and artist_ids):
+            raise SystemExit("Seed venues and artists first (flask seed).")
+        generators = {'venues': seed.venue_rows, 'artists': seed.artist_rows, 'shows': shows}
+        for entity, rows in generators.items():
+            for count in row_counts:
+                path = os.path.join(directory, f'{entity}.ndjson')
+                with open(path, 'w') as f:
+                    for row in rows(random.Random(0), count):
+                        f.write(json.dumps(row, default=str) + '\n')
+
+                t0 = time.perf_counter()
+                with app.test_request_context():
+                    loaded, rejected = importer.import_file(entity, path)
+                seconds = time.perf_counter() - t0
+                result = {
+                    'rows': count,
+                    'loaded': loaded,
+                    'rejected': rejected,
+                    'seconds': round(seconds, 2),
+                    'rows_per_second': round(count / seconds),
+                }
+                results[f'{entity}_{count}'] = result
+                print(f"{'import_' + entity:20} rows={count:>8} loaded={loaded:>8} "
+                      f"{result['seconds']:8.1f}s {result['rows_per_second']:8} rows/s")
+    return results
+
+
+def legacy_format_datetime(value, format='medium'):
+    """format_datetime as first written, fed str(start_time) by the templates."""
+    import babel.dates
+    import dateutil.parser
+
+    date = dateutil.parser.parse(value)
+    if format == 'full':
+        format = "EEEE MMMM, d, y 'at' h:mma"
+    elif format == 'medium':
+        format = "EE MM, dd, y h:mma"
+    return babel.dates.format_datetime(date, format, locale='en')
+
+
+def datetime_formatting(shows):
+    """Microseconds per call formatting the start times of a `shows`-show page."""
+    import filters
+
+    rng = random.Random(0)
+    start = datetime(2026, 1, 1)
+    # Hourly start times over four years, as seeded: a busy artist's page
+    # repeats some of them.
+    times = [start + timedelta(hours=rng.randrange(4 * 365 * 24)) for _ in range(shows)]
+
+    def per_call(format_one):
+        t0 = time.perf_counter()
+        for value in times:
+            format_one(value)
+        return round((time.perf_counter() - t0) / shows * 1e6, 3)
+
+    filters._format.cache_clear()
+    results = {
+        'shows': shows,
+        'legacy_us': per_call(lambda value: legacy_format_datetime(str(value), 'full')),
+        'cold_us': per_call(lambda value: filters.format_datetime(value, 'full')),
+        'warm_us': per_call(lambda value: filters.format_datetime(value, 'full')),
+    }
+    print(f"{'datetime_format':20} shows={shows:>8} legacy={results['legacy_us']:8.2f}us "
+          f"cold={results['cold_us']:8.2f}us warm={results['warm_us']:8.2f}us")
+    return results
+
+
+def legacy_venue_areas():
+    """/venues as first written: the areas, the venues of each area, then one
+    upcoming-show count per venue."""
+    from models import Venue, Show
+
+    areas = []
+    for city, state in Venue.query.with_entities(Venue.city, Venue.state).distinct(Venue.city, Venue.state):
+        venues = []
+        for venue in Venue.query.with_entities(Venue.id, Venue.name).filter_by(city=city, state=state):
+            venues.append({
+                "id": venue.id,
+                "name": venue.name,
+                "num_upcoming_shows": Show.query.join(Venue).filter(
+                    Show.venue_id == venue.id, Show.start_time > datetime.now()).count(),
+            })
+        areas.append({"city": city, "state": state, "venues": venues})
+    return areas
+
+
+def areas(iterations):
+    """Statements and latency of building the /venues areas, before and after."""
+    from app import app
+    from queries import venue_areas
+
+    results = {}
+    with app.app_context():
+        for name, build in (('legacy', legacy_venue_areas), ('venue_areas', venue_areas)):
+            built, p50, statements = timed(build, iterations)
+            results[name] = {
+                'areas': len(built),
+                'venues': sum(len(area['venues']) for area in built),
+                'statements': statements,
+                'p50_ms': round(p50 * 1000, 3),
+            }
+            print(f"{'areas_' + name:20} venues={results[name]['venues']:>8} "
+                  f"statements={statements:8.1f} p50={results[name]['p50_ms']:10.2f}ms")
+    return results
+
+
+def current_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--cold', action='store_true', help='Clear the render cache before every request.')
+    parser.add_argument('--startup-runs', type=int, default=5,
+                        help='Fresh interpreters to time startup in; 0 skips it.')
+    parser.add_argument('--startup-baseline', metavar='REVISION',
+                        help='Also time startup at this git revision, e.g. the commit before a refactor.')
+    parser.add_argument('--history-steps', type=int, default=0,
+                        help='Append this many batches of past shows, timing upcoming shows after each.')
+    parser.add_argument('--history-rows', type=int, default=100000, help='Past shows per history step.')
+    parser.add_argument('--import-rows', type=int, nargs='+', default=[],
+                        help='Time importing this many venues, artists and shows, e.g. 100000 1000000.')
+    parser.add_argument('--datetime-shows', type=int, default=0,
+                        help='Time start-time formatting for a page of this many shows; 0 skips it.')
+    parser.add_argument('--areas', action='store_true',
+                        help='Compare /venues area building with the original one-query-per-venue code.')
+    parser.add_argument('--output', default='bench_results', help='Directory for the JSON report.')
+    args = parser.parse_args()
+
+    startup_result = startup(args.startup_runs) if args.startup_runs else None
+    baseline_result = (startup_baseline(args.startup_runs, args.startup_baseline)
+                       if args.startup_runs and args.startup_baseline else None)
+    results = run(args.iterations, args.warmup, args.cold)
+    sizes = relation_sizes()
+    history_results = (history(args.history_steps, args.history_rows, args.iterations)
+                       if args.history_steps else None)
+    areas_results = areas(args.iterations) if args.areas else None
+    import_results = imports(args.import_rows) if args.import_rows else None
+    datetime_results = datetime_formatting(args.datetime_shows) if args.datetime_shows else None
+    commit = current_commit()
+    report = {
+        'commit': commit,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'iterations': args.iterations,
+        'cold': args.cold,
+        'startup': startup_result,
+        'startup_baseline': baseline_result,
+        'routes': results,
+        'api_vs_html': api_vs_html(results),
+        'history': history_results,
+        'areas': areas_results,
+        'imports': import_results,
+        'datetime_formatting': datetime_results,
+        'relation_sizes': sizes,
+    }
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"{commit}.json")
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {path}")
+
+
+if __name__ == '__main__':
+    main()
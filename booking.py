@@ -0,0 +1,181 @@
+from collections import Counter
+from datetime import datetime
+
+from flask import abort, current_app, request
+from sqlalchemy.exc import DBAPIError
+
+from api import api, json_response
+from cache import render_cache, show_page_keys
+from models import db, DEFAULT_SHOW_MINUTES, MAX_SHOW_MINUTES, Venue, Artist, Show
+from show_stats import stats_refresher
+
+
+# SQLSTATE raised by the no-double-booking constraints and boundary trigger.
+EXCLUSION_VIOLATION = '23P01'
+DOUBLE_BOOKED = 'The venue is already booked at that time.'
+
+
+#----------------------------------------------------------------------------#
+# Parsing.
+#----------------------------------------------------------------------------#
+
+def _whole_number(value):
+    """int() of an int or a string of digits; JSON true/false and floats are refused."""
+    if isinstance(value, (bool, float)):
+        raise TypeError(f"{type(value).__name__} is not a whole number")
+    return int(value)
+
+
+def parse_tour_row(number, venue_id, start_time, duration_minutes=None):
+    """(number, values, errors) for one show; exactly one of values and errors is set.
+
+    Shows without a duration get the column default. Start times are local
+    wall-clock times like every other show, so one with a UTC offset is
+    refused rather than compared with naive times.
+    """
+    try:
+        values = {'venue_id': _whole_number(venue_id),
+                  'start_time': datetime.fromisoformat(str(start_time).strip())}
+    except (TypeError, ValueError):
+        return number, None, ['Expected a venue id and a YYYY-MM-DD HH:MM start time.']
+    if values['start_time'].tzinfo is not None:
+        return number, None, ['Expected a local start time without a UTC offset.']
+    if duration_minutes is not None and str(duration_minutes).strip():
+        try:
+            values['duration_minutes'] = _whole_number(duration_minutes)
+        except (TypeError, ValueError):
+            values['duration_minutes'] = None
+        if not 1 <= (values['duration_minutes'] or 0) <= MAX_SHOW_MINUTES:
+            return number, None, [f'Expected a duration of 1 to {MAX_SHOW_MINUTES} minutes.']
+    return number, values, None
+
+
+def parse_tour_lines(text):
+    """Parse "venue_id, start_time[, minutes]" lines, numbered from 1; blank lines are skipped."""
+    rows = []
+    for number, line in enumerate(text.splitlines(), 1):
+        if line.strip():
+            venue_id, _, rest = line.partition(',')
+            start_time, _, duration_minutes = rest.partition(',')
+            rows.append(parse_tour_row(number, venue_id, start_time, duration_minutes))
+    return rows
+
+
+def booking_error(error):
+    """The message to show for a DBAPIError raised while booking."""
+    if getattr(error.orig, 'pgcode', None) == EXCLUSION_VIOLATION:
+        return DOUBLE_BOOKED
+    return str(error.orig).strip()
+
+
+#----------------------------------------------------------------------------#
+# Booking.
+#----------------------------------------------------------------------------#
+
+def _add_upcoming_counts(artist_id, shows):
+    """Bump counters for `shows`: one UPDATE per venue and one for the artist."""
+    now = datetime.now()
+    per_venue = Counter(values['venue_id'] for values in shows if values['start_time'] > now)
+    for venue_id, count in per_venue.items():
+        Venue.query.filter(Venue.id == venue_id).update(
+            {Venue.upcoming_shows_count: Venue.upcoming_shows_count + count},
+            synchronize_session=False)
+    if per_venue:
+        Artist.query.filter(Artist.id == artist_id).update(
+            {Artist.upcoming_shows_count: Artist.upcoming_shows_count + sum(per_venue.values())},
+            synchronize_session=False)
+
+
+def _insert(shows):
+    """One multi-row INSERT ... RETURNING id."""
+    table = Show.__table__
+    # A multi-row VALUES needs the same keys in every row.
+    shows = [dict(values, duration_minutes=values.get('duration_minutes', DEFAULT_SHOW_MINUTES)) for values in shows]
+    return db.session.execute(table.insert().values(shows).returning(table.c.id)).scalars().all()
+
+
+def book_tour(artist_id, rows, all_or_nothing=False):
+    """Create an artist's shows from parse_tour_lines() rows in one transaction.
+
+    Venue ids are checked with one query and the valid rows go in with a
+    single INSERT. If the database refuses that insert (say, a show that
+    double-books a venue), each row is retried in its own savepoint so only
+    the offending rows fail. With
+    `all_or_nothing`, any error books nothing.
+
+    Returns ({line: show id}, {line: [errors]}).
+    """
+    errors = {number: row_errors for number, _, row_errors in rows if row_errors}
+    if db.session.query(Artist.id).filter(Artist.id == artist_id).first() is None:
+        return {}, {0: ['Unknown artist.']}
+    venue_ids = {values['venue_id'] for _, values, _ in rows if values}
+    known = {id for id, in db.session.query(Venue.id).filter(Venue.id.in_(venue_ids))}
+    valid = []
+    for number, values, _ in rows:
+        if values is None:
+            continue
+        if values['venue_id'] not in known:
+            errors[number] = ['Unknown venue.']
+        else:
+            valid.append((number, dict(values, artist_id=artist_id)))
+    if not valid or (errors and all_or_nothing):
+        return {}, errors
+
+    booked = {}
+    try:
+        with db.session.begin_nested():
+            ids = _insert([values for _, values in valid])
+        booked = {number: id for (number, _), id in zip(valid, ids)}
+    except DBAPIError as e:
+        if all_or_nothing:
+            db.session.rollback()
+            return {}, {0: [booking_error(e)]}
+        for number, values in valid:
+            try:
+                with db.session.begin_nested():
+                    booked[number] = _insert([values])[0]
+            except DBAPIError as e:
+                errors[number] = [booking_error(e)]
+
+    booked_shows = [values for number, values in valid if number in booked]
+    _add_upcoming_counts(artist_id, booked_shows)
+    db.session.commit()
+
+    stale = {key for values in booked_shows for key in show_page_keys(values['venue_id'], artist_id)}
+    render_cache.invalidate(*stale)
+    if booked:
+        stats_refresher.request(current_app._get_current_object())
+    return booked, errors
+
+
+#----------------------------------------------------------------------------#
+# Routes.
+#----------------------------------------------------------------------------#
+
+@api.route('/tours', methods=['POST'])
+def create_tour():
+    """Book shows for one artist from JSON:
+
+        {"artist_id": 1, "all_or_nothing": false,
+         "shows": [{"venue_id": 2, "start_time": "2026-11-01T20:00",
+                    "duration_minutes": 90}, ...]}
+
+    Rows are numbered from 1 in the response, as in the form.
+    """
+    payload = request.get_json(silent=True) or {}
+    shows = payload.get('shows')
+    artist_id = payload.get('artist_id')
+    if not isinstance(artist_id, int) or isinstance(artist_id, bool) or not isinstance(shows, list):
+        abort(400, description="Expected artist_id and a list of shows")
+    if len(shows) > current_app.config['TOUR_MAX_SHOWS']:
+        abort(400, description=f"At most {current_app.config['TOUR_MAX_SHOWS']} shows per tour")
+    rows = [parse_tour_row(number, show.get('venue_id'), show.get('start_time'),
+                           show.get('duration_minutes'))
+            if isinstance(show, dict) else parse_tour_row(number, None, None)
+            for number, show in enumerate(shows, 1)]
+    booked, errors = book_tour(artist_id, rows, bool(payload.get('all_or_nothing')))
+    status = 201 if booked else 422
+    return json_response({
+        "booked": {str(number): id for number, id in booked.items()},
+        "errors": {str(number): messages for number, messages in errors.items()},
+    }, status)
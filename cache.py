@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import OrderedDict
+
+from flask import session
+
+from models import db, Show
+
+
+#----------------------------------------------------------------------------#
+# Render cache.
+#----------------------------------------------------------------------------#
+
+class RenderCache:
+    """Size-bounded LRU of rendered pages with a per-entry TTL.
+
+    The cache is per process; invalidations from a write only reach the
+    worker that served it. Page keys end in the page's ETag, so another
+    worker never serves a stale body under a new ETag; it just renders
+    the new version alongside the old one until that ages out.
+    """
+
+    def __init__(self, max_size=1024, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app, prefix='RENDER_CACHE'):
+        """Read the size and TTL from the {prefix}_SIZE and {prefix}_TTL settings."""
+        self.max_size = app.config.get(f'{prefix}_SIZE', self.max_size)
+        self.ttl = app.config.get(f'{prefix}_TTL', self.ttl)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *prefixes):
+        """Drop every entry whose key starts with one of `prefixes`, so
+        ('venue', 1) drops each cached version of venue 1's page."""
+        prefixes = set(prefixes)
+        lengths = {len(prefix) for prefix in prefixes}
+        with self._lock:
+            stale = [key for key in self._entries
+                     if any(key[:length] in prefixes for length in lengths)]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+            }
+
+
+render_cache = RenderCache()
+
+
+def cached_render(key, render):
+    """Return (html, 'hit'|'miss'|'bypass') for `key`, calling render() on a miss.
+
+    Pages are rendered with the layout's flashed messages, so a request
+    with pending flashes is rendered fresh and never stored.
+    """
+    if session.get('_flashes'):
+        return render(), 'bypass'
+    html = render_cache.get(key)
+    if html is not None:
+        return html, 'hit'
+    html = render()
+    render_cache.set(key, html)
+    return html, 'miss'
+
+
+#----------------------------------------------------------------------------#
+# Invalidation.
+#----------------------------------------------------------------------------#
+
+def venue_page_keys(venue_id):
+    """The venue page plus every artist page that lists one of its shows."""
+    artist_ids = db.session.query(Show.artist_id).filter(Show.venue_id == venue_id).distinct()
+    return [('venue', int(venue_id))] + [('artist', row.artist_id) for row in artist_ids]
+
+
+def artist_page_keys(artist_id):
+    """The artist page plus every venue page that lists one of its shows."""
+    venue_ids = db.session.query(Show.venue_id).filter(Show.artist_id == artist_id).distinct()
+    return [('artist', int(artist_id))] + [('venue', row.venue_id) for row in venue_ids]
+
+
+def show_page_keys(venue_id, artist_id):
+    return [('venue', int(venue_id)), ('artist', int(artist_id))]
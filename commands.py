@@ -0,0 +1,120 @@
+import json
+import sys
+
+import click
+
+
+#----------------------------------------------------------------------------#
+# Commands.
+#----------------------------------------------------------------------------#
+
+def init_app(app):
+    """Register the maintenance and data commands on `app.cli`.
+
+    Each command imports what it needs when it runs, so the web workers
+    never load the importer, exporter, seeder or plan checker.
+    """
+
+    @app.cli.command('reconcile-show-counts')
+    def reconcile_show_counts_command():
+        """Recompute upcoming-show counters. Run periodically, e.g. from cron."""
+        from queries import reconcile_upcoming_show_counts
+        fixed = reconcile_upcoming_show_counts()
+        print(f"Reconciled {fixed} upcoming show counters.")
+
+    @app.cli.command('refresh-show-stats')
+    def refresh_show_stats_command():
+        """Refresh the show stats views. Run more often than SHOW_STATS_MAX_AGE."""
+        from show_stats import refresh_show_stats
+        refresh_show_stats()
+        print("Refreshed show stats.")
+
+    @app.cli.command('manage-partitions')
+    @click.option('--months-ahead', default=app.config['SHOW_PARTITION_MONTHS_AHEAD'], show_default=True)
+    @click.option('--keep-months', default=app.config['SHOW_PARTITION_KEEP_MONTHS'], show_default=True,
+                  help='Archive partitions that ended more than this many months ago; 0 keeps all.')
+    @click.option('--archive-schema', default='archive', show_default=True)
+    @click.option('--drop', is_flag=True, help='Drop old partitions instead of archiving them.')
+    def manage_partitions_command(months_ahead, keep_months, archive_schema, drop):
+        """Pre-create future shows partitions and archive old ones. Run from cron."""
+        import partitions
+        for name in partitions.ensure_partitions(months_ahead):
+            print(f"Created {name}")
+        if keep_months:
+            for name in partitions.archive_partitions(keep_months, archive_schema, drop):
+                print(f"{'Dropped' if drop else 'Archived'} {name}")
+
+    @app.cli.command('check-plans')
+    def check_plans_command():
+        """Fail if any read route's queries fall back to a sequential scan.
+
+        Plans depend on data volume: run this against production-sized
+        data, or a database seeded with `flask seed` at a realistic size.
+        """
+        from plancheck import check_query_plans
+        failures = check_query_plans(app)
+        for path, relation, statement in failures:
+            print(f"{path}: sequential scan on {relation}\n    {' '.join(statement.split())}")
+        if failures:
+            sys.exit(1)
+        print("All route query plans use indexes.")
+
+    @app.cli.command('export')
+    @click.argument('entity', type=click.Choice(['venues', 'artists', 'shows']))
+    @click.option('--format', 'format', type=click.Choice(['csv', 'ndjson']), default='csv')
+    @click.option('--output', type=click.File('w'), default='-', help='Defaults to stdout.')
+    def export_command(entity, format, output):
+        """Stream a full table dump as CSV or NDJSON."""
+        import export
+        chunks = export.FORMATS[format][0]
+        for chunk in chunks(entity):
+            output.write(chunk)
+
+    @app.cli.command('import')
+    @click.argument('entity', type=click.Choice(['venues', 'artists', 'shows']))
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--format', 'format', type=click.Choice(['csv', 'ndjson']),
+                  help='Defaults to the file extension.')
+    @click.option('--batch-size', type=click.IntRange(min=1),
+                  help='Rows per INSERT.  [default: importer.BATCH_ROWS]')
+    @click.option('--rejects', type=click.File('w'), help='Write rejected rows here as NDJSON.')
+    def import_command(entity, path, format, batch_size, rejects):
+        """Validate and bulk-load venues, artists or shows from CSV/NDJSON."""
+        import importer
+
+        def reject(number, errors):
+            if rejects is not None:
+                rejects.write(json.dumps({"line": number, "errors": errors}) + "\n")
+            else:
+                print(f"line {number}: {errors}", file=sys.stderr)
+
+        # Flask-WTF forms expect a request context even with explicit formdata.
+        with app.test_request_context():
+            loaded, rejected = importer.import_file(entity, path, format,
+                                                     batch_size or importer.BATCH_ROWS, reject)
+        print(f"Imported {loaded} {entity}; rejected {rejected}.")
+
+    @app.cli.command('seed')
+    @click.option('--venues', default=1000, show_default=True)
+    @click.option('--artists', default=4000, show_default=True)
+    @click.option('--shows', default=100000, show_default=True)
+    @click.option('--seed', 'random_seed', default=0, show_default=True, help='Random seed.')
+    @click.option('--batch-size', type=click.IntRange(min=1),
+                  help='Rows per INSERT.  [default: seed.BATCH_ROWS]')
+    def seed_command(venues, artists, shows, random_seed, batch_size):
+        """Append deterministic synthetic venues, artists and shows."""
+        import seed
+
+        def progress(table, inserted):
+            print(f"{table}: {inserted} rows", end="\r")
+
+        seed.seed(venues, artists, shows, random_seed, batch_size or seed.BATCH_ROWS, progress)
+        print("\nSeeded.")
+
+    @app.cli.command('build-assets')
+    def build_assets_command():
+        """Bundle, fingerprint and precompress CSS/JS into static/dist."""
+        import assets
+        for name, hashed in assets.build(app.static_folder).items():
+            print(f"{name} -> {assets.DIST}/{hashed}")
+        print("Restart the app to serve the new bundles.")
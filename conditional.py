@@ -0,0 +1,51 @@
+import hashlib
+from datetime import timezone
+
+from flask import request, session
+
+
+#----------------------------------------------------------------------------#
+# Conditional GET.
+#----------------------------------------------------------------------------#
+
+def make_etag(*parts):
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def last_modified_from(version):
+    """Latest change time in a page version tuple, as an aware UTC datetime.
+
+    updated_at values are stored in UTC, while show start times are local
+    wall-clock times like the rest of the app's comparisons.
+    """
+    if version is None:
+        return None
+    updated_at, shows_updated_at, others_updated_at, _, _, last_started = version
+    stamps = [stamp.replace(tzinfo=timezone.utc)
+              for stamp in (updated_at, shows_updated_at, others_updated_at) if stamp]
+    if last_started:
+        stamps.append(last_started.astimezone(timezone.utc))
+    return max(stamps).replace(microsecond=0)
+
+
+def is_not_modified(etag, last_modified=None):
+    """Whether the client's cached copy matches etag / last_modified.
+
+    If-None-Match takes precedence over If-Modified-Since. Requests with
+    pending flash messages always get a full page.
+    """
+    if session.get('_flashes'):
+        return False
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if request.if_modified_since and last_modified:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def add_validators(response, etag, last_modified=None):
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    return response
@@ -1,14 +1,96 @@
 import os
-SECRET_KEY = os.urandom(32)
+# Set SECRET_KEY in production: a random per-process key breaks sessions and
+# CSRF tokens as soon as more than one worker serves requests.
+SECRET_KEY = os.environ.get('SECRET_KEY') or os.urandom(32)
 # Grabs the folder where the script runs.
 basedir = os.path.abspath(os.path.dirname(__file__))
 
 # Enable debug mode.
 DEBUG = True
 
-# Connect to the database
 
+def env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def env_bool(name, default):
+    return os.environ.get(name, str(default)).lower() in ('1', 'true', 'yes', 'on')
 
-# TODO IMPLEMENT DATABASE URL
-SQLALCHEMY_DATABASE_URI = 'postgresql://postgres@localhost:5432/fyyur'
+
+# Connect to the database
+SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'postgresql://postgres@localhost:5432/fyyur')
 SQLALCHEMY_TRACK_MODIFICATIONS = True
+
+# Optional read replica. GET/HEAD requests read from it unless the browser
+# wrote within the last READ_YOUR_WRITES_SECONDS; everything else uses the
+# primary.
+if os.environ.get('DATABASE_REPLICA_URL'):
+    SQLALCHEMY_BINDS = {'replica': os.environ['DATABASE_REPLICA_URL']}
+READ_YOUR_WRITES_SECONDS = env_int('READ_YOUR_WRITES_SECONDS', 5)
+
+# Queries running longer than this are cancelled by Postgres (0 disables).
+DB_STATEMENT_TIMEOUT_MS = env_int('DB_STATEMENT_TIMEOUT_MS', 5000)
+
+# PgBouncer in transaction-pooling mode rejects the `options` startup
+# parameter and does not keep session state between transactions, so the
+# statement timeout is applied with SET LOCAL at the start of every
+# transaction instead.
+DB_PGBOUNCER = env_bool('DB_PGBOUNCER', False)
+
+SQLALCHEMY_ENGINE_OPTIONS = {
+    'pool_size': env_int('DB_POOL_SIZE', 5),
+    'max_overflow': env_int('DB_MAX_OVERFLOW', 10),
+    'pool_timeout': env_int('DB_POOL_TIMEOUT', 30),
+    'pool_recycle': env_int('DB_POOL_RECYCLE', 1800),
+    'pool_pre_ping': env_bool('DB_POOL_PRE_PING', True),
+}
+if not DB_PGBOUNCER and DB_STATEMENT_TIMEOUT_MS:
+    SQLALCHEMY_ENGINE_OPTIONS['connect_args'] = {
+        'options': f'-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}',
+    }
+
+# Shows feed pagination
+SHOWS_PAGE_SIZE = 30
+SHOWS_PAGE_SIZE_MAX = 100
+
+# Maximum number of hits returned by the venue/artist search routes
+SEARCH_RESULT_LIMIT = 50
+
+# Rendered venue/artist detail pages: max entries per worker, seconds to live
+RENDER_CACHE_SIZE = 1024
+RENDER_CACHE_TTL = 60
+
+# Genre facet counts for /venues and /artists: max entries per worker, seconds to live
+FACET_CACHE_SIZE = 128
+FACET_CACHE_TTL = 60
+
+# /api/v1 pagination
+API_PAGE_SIZE = 50
+API_PAGE_SIZE_MAX = 500
+
+# Monthly shows partitions: how far ahead `flask manage-partitions` creates
+# them, and how many past months it keeps attached (0 keeps all of them)
+SHOW_PARTITION_MONTHS_AHEAD = env_int('SHOW_PARTITION_MONTHS_AHEAD', 12)
+SHOW_PARTITION_KEEP_MONTHS = env_int('SHOW_PARTITION_KEEP_MONTHS', 0)
+
+# Show stats materialized views: how old (seconds) they may be before
+# listings fall back to the counter columns, and the minimum gap between
+# the background refreshes triggered by show writes (which can be turned
+# off, leaving refreshes to cron)
+SHOW_STATS_MAX_AGE = env_int('SHOW_STATS_MAX_AGE', 300)
+SHOW_STATS_REFRESH_INTERVAL = env_int('SHOW_STATS_REFRESH_INTERVAL', 10)
+SHOW_STATS_BACKGROUND_REFRESH = env_bool('SHOW_STATS_BACKGROUND_REFRESH', True)
+
+# Most shows one tour booking may create
+TOUR_MAX_SHOWS = 500
+
+# Artist/venue name autocomplete: default and maximum matches, and how often
+# each worker reloads its in-memory index to pick up other workers' writes
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_LIMIT_MAX = 50
+AUTOCOMPLETE_REBUILD_SECONDS = 300
+
+# Request instrumentation: slow-request log threshold, and how many times
+# one statement may repeat within a request before it is flagged as N+1
+SLOW_REQUEST_MS = env_int('SLOW_REQUEST_MS', 500)
+N_PLUS_ONE_THRESHOLD = env_int('N_PLUS_ONE_THRESHOLD', 5)
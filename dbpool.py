@@ -0,0 +1,148 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import event, exc, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+
+#----------------------------------------------------------------------------#
+# Pool statistics.
+#----------------------------------------------------------------------------#
+
+class PoolStats:
+    """Process-wide checkout counters used to size pools against workers."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.hold_seconds = 0.0
+
+    def record_wait(self, seconds, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def record_hold(self, seconds):
+        with self._lock:
+            self.hold_seconds += seconds
+
+    def snapshot(self, pool=None):
+        with self._lock:
+            stats = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds, 6),
+                "wait_seconds_max": round(self.max_wait_seconds, 6),
+                "hold_seconds_total": round(self.hold_seconds, 6),
+            }
+        if isinstance(pool, QueuePool):
+            stats.update({
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+            })
+        return stats
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_stats.record_wait(time.perf_counter() - start)
+        return connection
+
+
+def _on_connect(dbapi_connection, connection_record):
+    connection_record.info['pid'] = os.getpid()
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    # A connection opened before a fork (e.g. under gunicorn --preload) is
+    # shared with the parent's socket; drop it and let the pool reconnect.
+    pid = os.getpid()
+    if connection_record.info.get('pid', pid) != pid:
+        connection_record.dbapi_connection = connection_proxy.dbapi_connection = None
+        raise exc.DisconnectionError(
+            f"Connection record belongs to pid {connection_record.info['pid']}, "
+            f"attempting to check out in pid {pid}")
+    connection_record.info['checked_out_at'] = time.perf_counter()
+
+
+def _on_checkin(dbapi_connection, connection_record):
+    started = connection_record.info.pop('checked_out_at', None)
+    if started is not None:
+        pool_stats.record_hold(time.perf_counter() - started)
+
+
+def _set_statement_timeout(connection):
+    """SET LOCAL the timeout of engines created by a PgBouncer app."""
+    timeout = connection.get_execution_options().get('fyyur_statement_timeout_ms')
+    if timeout is None:
+        return
+    ms = int(connection.info.get('statement_timeout_ms', timeout))
+    # Straight to the DBAPI cursor: executing through `connection`
+    # from inside its own begin event would re-enter the event.
+    cursor = connection.connection.cursor()
+    cursor.execute(f'SET LOCAL statement_timeout = {ms}')
+    cursor.close()
+
+
+#----------------------------------------------------------------------------#
+# Setup.
+#----------------------------------------------------------------------------#
+
+def init_app(app):
+    """Install the instrumented pool and, behind PgBouncer, SET LOCAL timeouts.
+
+    Must run before the engine is first created. The timeout travels in
+    this app's engine options, so it only applies to the engines (primary
+    and binds) this app creates. A connection can opt out of the
+    per-transaction timeout by setting info['statement_timeout_ms'].
+    Connections inherited across a fork are discarded on checkout.
+    """
+    # config.SQLALCHEMY_ENGINE_OPTIONS is shared by every app built from it.
+    options = app.config['SQLALCHEMY_ENGINE_OPTIONS'] = dict(app.config['SQLALCHEMY_ENGINE_OPTIONS'])
+    options.setdefault('poolclass', InstrumentedQueuePool)
+    for name, listener in (('connect', _on_connect), ('checkout', _on_checkout), ('checkin', _on_checkin)):
+        if not event.contains(InstrumentedQueuePool, name, listener):
+            event.listen(InstrumentedQueuePool, name, listener)
+
+    timeout = app.config.get('DB_STATEMENT_TIMEOUT_MS')
+    if app.config.get('DB_PGBOUNCER') and timeout:
+        options['execution_options'] = dict(options.get('execution_options', {}),
+                                            fyyur_statement_timeout_ms=timeout)
+        if not event.contains(Engine, 'begin', _set_statement_timeout):
+            event.listen(Engine, 'begin', _set_statement_timeout)
+
+
+@contextmanager
+def maintenance_transaction(engine):
+    """A transaction with the statement timeout lifted, for maintenance jobs."""
+    with engine.connect() as connection:
+        connection.info['statement_timeout_ms'] = 0
+        try:
+            with connection.begin():
+                connection.execute(text('SET LOCAL statement_timeout = 0'))
+                yield connection
+        finally:
+            connection.info.pop('statement_timeout_ms', None)
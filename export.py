@@ -0,0 +1,84 @@
+import csv
+import io
+
+from flask import Response, abort, stream_with_context
+
+from api import api, dumps
+from models import db, Venue, Artist, Show
+from queries import VENUE_COLUMNS, ARTIST_COLUMNS, SHOW_FEED_COLUMNS
+
+
+EXPORTS = {
+    'venues': (Venue, VENUE_COLUMNS),
+    'artists': (Artist, ARTIST_COLUMNS),
+    'shows': (Show, SHOW_FEED_COLUMNS),
+}
+
+CHUNK_ROWS = 1000
+
+
+#----------------------------------------------------------------------------#
+# Streaming.
+#----------------------------------------------------------------------------#
+
+def export_rows(entity):
+    """Yield every row of `entity` as a tuple, via a server-side cursor.
+
+    stream_results makes psycopg2 use a named cursor and yield_per bounds
+    how many rows are buffered, so memory stays flat however large the
+    table is. Shows carry their venue and artist names from the same query.
+    """
+    model, columns = EXPORTS[entity]
+    query = db.session.query(*[column.label(key) for key, column in columns.items()])
+    if model is Show:
+        query = query.select_from(Show).join(Venue, Show.venue_id == Venue.id) \
+                     .join(Artist, Show.artist_id == Artist.id)
+    query = query.order_by(model.id).execution_options(stream_results=True)
+    yield from query.yield_per(CHUNK_ROWS)
+
+
+def csv_chunks(entity):
+    columns = EXPORTS[entity][1]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for count, row in enumerate(export_rows(entity), 1):
+        writer.writerow([';'.join(value) if isinstance(value, list) else value for value in row])
+        if count % CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def ndjson_chunks(entity):
+    columns = list(EXPORTS[entity][1])
+    lines = []
+    for row in export_rows(entity):
+        line = dumps(dict(zip(columns, row)))
+        lines.append(line if isinstance(line, str) else line.decode())
+        if len(lines) == CHUNK_ROWS:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+FORMATS = {
+    'csv': (csv_chunks, 'text/csv'),
+    'ndjson': (ndjson_chunks, 'application/x-ndjson'),
+}
+
+
+#----------------------------------------------------------------------------#
+# Routes.
+#----------------------------------------------------------------------------#
+
+@api.route('/export/<entity>.<format>')
+def export(entity, format):
+    if entity not in EXPORTS or format not in FORMATS:
+        abort(404)
+    chunks, mimetype = FORMATS[format]
+    response = Response(stream_with_context(chunks(entity)), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={entity}.{format}'
+    return response
@@ -0,0 +1,15 @@
+from flask_migrate import Migrate
+from flask_moment import Moment
+
+from routing import RoutingSQLAlchemy
+
+
+#----------------------------------------------------------------------------#
+# Extensions.
+#----------------------------------------------------------------------------#
+
+# Created unbound so models and blueprints can import them without an app;
+# create_app() binds them with init_app().
+db = RoutingSQLAlchemy()
+migrate = Migrate()
+moment = Moment()
@@ -0,0 +1,55 @@
+from flask import request, url_for
+
+from cache import RenderCache
+from genres import genre_table
+from queries import genre_facets
+
+
+#----------------------------------------------------------------------------#
+# Genre facets.
+#----------------------------------------------------------------------------#
+
+# Kept apart from the page render cache so facet lookups neither evict
+# pages nor count in its hit rate.
+facet_cache = RenderCache(max_size=128)
+
+def selected_genres():
+    """Known genres chosen with ?genre=...&genre=..., deduplicated and sorted."""
+    return sorted(set(genre for genre in request.args.getlist('genre') if genre in genre_table))
+
+
+def cached_genre_facets(model, genres):
+    """genre_facets() through the facet cache.
+
+    Counts over six-figure tables are still a full unnest when no genre is
+    selected, so they are reused for FACET_CACHE_TTL seconds; writes do
+    not invalidate them.
+    """
+    key = (model.__tablename__, tuple(genres))
+    facets = facet_cache.get(key)
+    if facets is None:
+        facets = [tuple(row) for row in genre_facets(model, genres)]
+        facet_cache.set(key, facets)
+    return facets
+
+
+def facet_links(endpoint, model, genres):
+    """Facet entries for pages/genre_facets.html.
+
+    Each links to the current listing with that genre toggled. Selected
+    genres are always listed, even when nothing matches.
+    """
+    counts = dict(cached_genre_facets(model, genres))
+    for genre in genres:
+        counts.setdefault(genre, 0)
+    links = []
+    for genre, count in sorted(counts.items(), key=lambda item: (item[0] not in genres, -item[1], item[0])):
+        selected = genre in genres
+        toggled = [other for other in genres if other != genre] if selected else sorted(genres + [genre])
+        links.append({
+            "genre": genre,
+            "count": count,
+            "selected": selected,
+            "url": url_for(endpoint, genre=toggled),
+        })
+    return links
@@ -0,0 +1,54 @@
+from datetime import timezone
+from functools import lru_cache
+
+
+#----------------------------------------------------------------------------#
+# Datetime formatting.
+#----------------------------------------------------------------------------#
+
+# The app's own patterns, which replace babel's 'full' and 'medium'. Any
+# other format (babel's 'short' and 'long', or a raw pattern) goes to
+# babel.dates.format_datetime unchanged.
+FORMATS = {
+    'full': "EEEE MMMM, d, y 'at' h:mma",
+    'medium': "EE MM, dd, y h:mma",
+}
+
+
+@lru_cache(maxsize=None)
+def _compiled(format, locale):
+    """Parse one of FORMATS and the locale once per (format, locale)."""
+    # babel and dateutil are imported on first use; they are slow to import
+    # and only needed once a page is rendered.
+    import babel.dates
+    from babel.core import Locale
+    return babel.dates.parse_pattern(FORMATS[format]), Locale.parse(locale)
+
+
+@lru_cache(maxsize=4096)
+def _parse(value):
+    import dateutil.parser
+    return dateutil.parser.parse(value)
+
+
+@lru_cache(maxsize=8192)
+def _format(value, format, locale):
+    if format not in FORMATS:
+        import babel.dates
+        return babel.dates.format_datetime(value, format, locale=locale)
+    pattern, locale = _compiled(format, locale)
+    if value.tzinfo is None:
+        # babel.dates.format_datetime treats naive values as UTC.
+        value = value.replace(tzinfo=timezone.utc)
+    return pattern.apply(value, locale)
+
+
+def format_datetime(value, format='medium', locale='en'):
+    """Format a datetime for display; strings are still accepted and parsed.
+
+    Show times repeat heavily across a page (and across pages), so both the
+    string parse and the formatted output are memoized in bounded LRUs.
+    """
+    if isinstance(value, str):
+        value = _parse(value)
+    return _format(value, format, locale)
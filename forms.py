@@ -1,9 +1,11 @@
 from datetime import datetime
-from flask_wtf import Form
-from wtforms import StringField, SelectField, SelectMultipleField, DateTimeField, BooleanField
-from wtforms.validators import DataRequired, AnyOf, URL
+from flask_wtf import FlaskForm
+from wtforms import StringField, SelectField, SelectMultipleField, DateTimeField, BooleanField, TextAreaField, IntegerField
+from wtforms.validators import DataRequired, AnyOf, URL, NumberRange
 
-class ShowForm(Form):
+from models import DEFAULT_SHOW_MINUTES, MAX_SHOW_MINUTES
+
+class ShowForm(FlaskForm):
     artist_id = StringField(
         'artist_id'
     )
@@ -15,8 +17,23 @@ class ShowForm(Form):
         validators=[DataRequired()],
         default= datetime.today()
     )
+    duration_minutes = IntegerField(
+        'duration_minutes',
+        validators=[NumberRange(min=1, max=MAX_SHOW_MINUTES)],
+        default=DEFAULT_SHOW_MINUTES
+    )
+
+class TourForm(FlaskForm):
+    artist_id = StringField(
+        'artist_id', validators=[DataRequired()]
+    )
+    # One show per line: "venue_id, YYYY-MM-DD HH:MM[, minutes]"
+    shows = TextAreaField(
+        'shows', validators=[DataRequired()]
+    )
+    all_or_nothing = BooleanField( 'all_or_nothing' )
 
-class VenueForm(Form):
+class VenueForm(FlaskForm):
     name = StringField(
         'name', validators=[DataRequired()]
     )
@@ -128,7 +145,7 @@ class VenueForm(Form):
 
 
 
-class ArtistForm(Form):
+class ArtistForm(FlaskForm):
     name = StringField(
         'name', validators=[DataRequired()]
     )
@@ -0,0 +1,101 @@
+import threading
+
+from sqlalchemy import cast, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.types import SmallInteger, TypeDecorator
+
+from extensions import db
+
+
+#----------------------------------------------------------------------------#
+# Genre lookup table.
+#----------------------------------------------------------------------------#
+
+class GenreTable:
+    """In-process copy of the `genre` lookup table.
+
+    Loaded from the primary on first use and reloaded when an unknown id
+    or name turns up (a genre added since the load). Genres are only ever
+    added, so a loaded copy never maps an id to the wrong name.
+    """
+
+    def __init__(self):
+        self._ids = {}
+        self._names = {}
+        self._loaded_once = False
+        self._lock = threading.Lock()
+
+    def load(self):
+        with db.engine.connect() as connection:
+            rows = connection.execute(text('SELECT id, name FROM genre')).all()
+        with self._lock:
+            self._names = {id: name for id, name in rows}
+            self._ids = {name: id for id, name in rows}
+            self._loaded_once = True
+
+    def _loaded(self):
+        if not self._loaded_once:
+            self.load()
+        return self._ids, self._names
+
+    def __contains__(self, name):
+        return name in self._loaded()[0]
+
+    def ids(self, names):
+        ids = self._loaded()[0]
+        if any(name not in ids for name in names):
+            self.load()
+            ids = self._ids
+        try:
+            return [ids[name] for name in names]
+        except KeyError as error:
+            raise ValueError(f"Unknown genre: {error.args[0]!r}") from None
+
+    def names(self, ids):
+        names = self._loaded()[1]
+        if any(id not in names for id in ids):
+            self.load()
+            names = self._names
+        return [names[id] for id in ids]
+
+
+genre_table = GenreTable()
+
+
+#----------------------------------------------------------------------------#
+# Column types.
+#----------------------------------------------------------------------------#
+
+class GenreName(TypeDecorator):
+    """A smallint genre id in the database, its name in Python."""
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else genre_table.ids([value])[0]
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else genre_table.names([value])[0]
+
+
+class GenreNames(TypeDecorator):
+    """A smallint[] of genre ids in the database, a list of names in Python.
+
+    Models, forms, templates and exports keep working with genre names,
+    while rows and their GIN indexes store two bytes per genre.
+    """
+
+    impl = ARRAY(SmallInteger)
+    cache_ok = True
+
+    def bind_expression(self, bindvalue):
+        # psycopg2 sends Python int lists as integer[], and smallint[] @>
+        # integer[] has no operator.
+        return cast(bindvalue, ARRAY(SmallInteger))
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else genre_table.ids(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else genre_table.names(value)
@@ -0,0 +1,168 @@
+import csv
+import json
+from itertools import islice
+
+from sqlalchemy.exc import DBAPIError
+from werkzeug.datastructures import MultiDict
+from wtforms.validators import DataRequired, InputRequired
+
+from forms import VenueForm, ArtistForm, ShowForm
+from models import db, Venue, Artist, Show
+from queries import reconcile_upcoming_show_counts
+from show_stats import refresh_show_stats
+
+
+IMPORTS = {
+    'venues': (Venue, VenueForm),
+    'artists': (Artist, ArtistForm),
+    'shows': (Show, ShowForm),
+}
+
+BATCH_ROWS = 5000
+
+
+#----------------------------------------------------------------------------#
+# Reading.
+#----------------------------------------------------------------------------#
+
+def read_rows(path, format=None):
+    """Yield (line number, dict) pairs from a CSV or NDJSON file, lazily."""
+    format = format or ('ndjson' if path.endswith(('.ndjson', '.jsonl')) else 'csv')
+    with open(path, newline='') as f:
+        if format == 'csv':
+            # Line 1 is the header.
+            for number, row in enumerate(csv.DictReader(f), 2):
+                yield number, row
+        else:
+            for number, line in enumerate(f, 1):
+                if line.strip():
+                    yield number, json.loads(line)
+
+
+def _formdata(row):
+    """Turn a row into form data; genres may be a list or ';'-separated."""
+    data = MultiDict()
+    for key, value in row.items():
+        if key == 'genres' and isinstance(value, str):
+            value = [genre.strip() for genre in value.split(';') if genre.strip()]
+        if isinstance(value, list):
+            for item in value:
+                data.add(key, item)
+        elif isinstance(value, bool):
+            if value:
+                data.add(key, 'y')
+        elif value is not None:
+            data.add(key, str(value))
+    return data
+
+
+def validate(form_class, row):
+    """Validate a row with the same form the create routes use.
+
+    A required field missing from the row is an error rather than taking
+    the form's default (ShowForm.start_time defaults to today).
+    """
+    form = form_class(formdata=_formdata(row), meta={'csrf': False})
+    missing = {name: ['This field is required.'] for name, field in form._fields.items()
+               if not field.raw_data
+               and any(isinstance(v, (DataRequired, InputRequired)) for v in field.validators)}
+    if not form.validate() or missing:
+        return None, dict(form.errors, **missing)
+    return {name: field.data for name, field in form._fields.items()}, None
+
+
+def _check_show_references(batch, reject):
+    """Drop shows whose venue or artist does not exist, in two queries."""
+    venue_ids = {values['venue_id'] for _, values in batch}
+    artist_ids = {values['artist_id'] for _, values in batch}
+    venues = {id for id, in db.session.query(Venue.id).filter(Venue.id.in_(venue_ids))}
+    artists = {id for id, in db.session.query(Artist.id).filter(Artist.id.in_(artist_ids))}
+    valid = []
+    for number, values in batch:
+        errors = {}
+        if values['venue_id'] not in venues:
+            errors['venue_id'] = ['Unknown venue.']
+        if values['artist_id'] not in artists:
+            errors['artist_id'] = ['Unknown artist.']
+        if errors:
+            reject(number, errors)
+        else:
+            valid.append((number, values))
+    return valid
+
+
+#----------------------------------------------------------------------------#
+# Loading.
+#----------------------------------------------------------------------------#
+
+def _load_batch(model, batch, reject):
+    """Insert a batch in one executemany and one transaction.
+
+    If the database refuses the batch, it is replayed row by row so only
+    the offending rows are rejected.
+    """
+    table = model.__table__
+    try:
+        db.session.execute(table.insert(), [values for _, values in batch])
+        db.session.commit()
+        return len(batch)
+    except DBAPIError:
+        db.session.rollback()
+    loaded = 0
+    for number, values in batch:
+        try:
+            db.session.execute(table.insert(), [values])
+            db.session.commit()
+            loaded += 1
+        except DBAPIError as e:
+            db.session.rollback()
+            reject(number, {'database': [str(e.orig).strip()]})
+    return loaded
+
+
+def import_file(entity, path, format=None, batch_rows=BATCH_ROWS, reject=None):
+    """Validate and load a CSV/NDJSON file; returns (loaded, rejected).
+
+    The file is read lazily and loaded `batch_rows` rows at a time, so memory
+    is bounded by the batch size rather than the file size. `reject` is
+    called with (line number, errors) for each refused row.
+    """
+    model, form_class = IMPORTS[entity]
+    rejected = 0
+
+    def on_reject(number, errors):
+        nonlocal rejected
+        rejected += 1
+        if reject is not None:
+            reject(number, errors)
+
+    def valid_rows():
+        for number, row in read_rows(path, format):
+            values, errors = validate(form_class, row)
+            if errors:
+                on_reject(number, errors)
+                continue
+            if model is Show:
+                try:
+                    values['venue_id'] = int(values['venue_id'])
+                    values['artist_id'] = int(values['artist_id'])
+                except (TypeError, ValueError):
+                    on_reject(number, {'venue_id': ['Ids must be integers.']})
+                    continue
+            yield number, values
+
+    loaded = 0
+    rows = valid_rows()
+    while True:
+        batch = list(islice(rows, batch_rows))
+        if not batch:
+            break
+        if model is Show:
+            batch = _check_show_references(batch, on_reject)
+        if batch:
+            loaded += _load_batch(model, batch, on_reject)
+
+    if model is Show and loaded:
+        reconcile_upcoming_show_counts()
+        refresh_show_stats()
+    return loaded, rejected
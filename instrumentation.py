@@ -0,0 +1,162 @@
+import threading
+import time
+from collections import Counter, defaultdict
+
+from flask import g, has_request_context, request, template_rendered, before_render_template
+from flask.signals import signals_available
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+#----------------------------------------------------------------------------#
+# Per-endpoint metrics.
+#----------------------------------------------------------------------------#
+
+class EndpointMetrics:
+    """Per-process, per-endpoint counters rendered in Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = Counter()
+        self.request_seconds = Counter()
+        self.db_queries = Counter()
+        self.db_seconds = Counter()
+        self.render_seconds = Counter()
+        self.n_plus_one = Counter()
+        self.buckets = defaultdict(lambda: [0] * len(REQUEST_BUCKETS))
+
+    def observe(self, endpoint, seconds, queries, db_seconds, render_seconds, suspects):
+        with self._lock:
+            self.requests[endpoint] += 1
+            self.request_seconds[endpoint] += seconds
+            self.db_queries[endpoint] += queries
+            self.db_seconds[endpoint] += db_seconds
+            self.render_seconds[endpoint] += render_seconds
+            self.n_plus_one[endpoint] += suspects
+            buckets = self.buckets[endpoint]
+            for i, bound in enumerate(REQUEST_BUCKETS):
+                if seconds <= bound:
+                    buckets[i] += 1
+
+    def exposition(self, gauges=()):
+        """Prometheus text exposition; `gauges` is (name, help, {labels: value})."""
+        lines = []
+
+        def header(name, kind, help):
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def sample(name, labels, value):
+            label_text = ",".join(f'{key}="{label}"' for key, label in labels)
+            lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        with self._lock:
+            for name, help, counter in (
+                ("fyyur_requests_total", "Requests served.", self.requests),
+                ("fyyur_db_queries_total", "SQL statements executed.", self.db_queries),
+                ("fyyur_db_seconds_total", "Time spent in SQL statements.", self.db_seconds),
+                ("fyyur_render_seconds_total", "Time spent rendering templates.", self.render_seconds),
+                ("fyyur_n_plus_one_suspected_total",
+                 "Statements repeated within one request past the N+1 threshold.", self.n_plus_one),
+            ):
+                header(name, "counter", help)
+                for endpoint, value in sorted(counter.items()):
+                    sample(name, (("endpoint", endpoint),), value)
+
+            header("fyyur_request_seconds", "histogram", "Request latency.")
+            for endpoint, buckets in sorted(self.buckets.items()):
+                for bound, count in zip(REQUEST_BUCKETS, buckets):
+                    sample("fyyur_request_seconds_bucket", (("endpoint", endpoint), ("le", bound)), count)
+                sample("fyyur_request_seconds_bucket", (("endpoint", endpoint), ("le", "+Inf")),
+                       self.requests[endpoint])
+                sample("fyyur_request_seconds_sum", (("endpoint", endpoint),), self.request_seconds[endpoint])
+                sample("fyyur_request_seconds_count", (("endpoint", endpoint),), self.requests[endpoint])
+
+        for name, help, values in gauges:
+            header(name, "gauge", help)
+            for labels, value in values.items():
+                sample(name, labels, value)
+        return "\n".join(lines) + "\n"
+
+
+metrics = EndpointMetrics()
+
+
+#----------------------------------------------------------------------------#
+# Hooks.
+#----------------------------------------------------------------------------#
+
+# The start time lives on the execution context rather than a stack on the
+# connection: after_cursor_execute never runs for a statement that raises,
+# and its context is simply dropped.
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context.fyyur_query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context.fyyur_query_started
+    if has_request_context() and 'sql_statements' in g:
+        g.sql_seconds += elapsed
+        g.sql_statements[statement] += 1
+
+
+def _before_render(sender, template, context, **extra):
+    if has_request_context():
+        g.render_started = time.perf_counter()
+
+
+def _rendered(sender, template, context, **extra):
+    if has_request_context() and 'render_started' in g:
+        g.render_seconds += time.perf_counter() - g.pop('render_started')
+
+
+def init_app(app):
+    """Record SQL count/time, render time and latency for every request.
+
+    Identical statements executed more than N_PLUS_ONE_THRESHOLD times in
+    one request are logged as suspected N+1 queries, and requests slower
+    than SLOW_REQUEST_MS get a slow-request log line.
+
+    Recording happens at teardown, which also runs for requests that ended
+    in an unhandled exception; after_request only notes the status code.
+    """
+    if signals_available:
+        before_render_template.connect(_before_render, app)
+        template_rendered.connect(_rendered, app)
+
+    @app.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
+        g.sql_statements = Counter()
+        g.sql_seconds = 0.0
+        g.render_seconds = 0.0
+
+    @app.after_request
+    def remember_status(response):
+        g.response_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def record(error):
+        if 'request_started' not in g:
+            return
+        status = g.get('response_status', 500)
+        seconds = time.perf_counter() - g.request_started
+        endpoint = request.endpoint or 'unmatched'
+        queries = sum(g.sql_statements.values())
+        suspects = [(statement, count) for statement, count in g.sql_statements.items()
+                    if count > app.config['N_PLUS_ONE_THRESHOLD']]
+        metrics.observe(endpoint, seconds, queries, g.sql_seconds, g.render_seconds, len(suspects))
+
+        for statement, count in suspects:
+            app.logger.warning('Suspected N+1 in %s: %d x %s', endpoint, count, ' '.join(statement.split()))
+        if seconds * 1000 > app.config['SLOW_REQUEST_MS']:
+            app.logger.warning(
+                'Slow request: %s %s endpoint=%s status=%d total=%.1fms db=%.1fms queries=%d render=%.1fms',
+                request.method, request.full_path.rstrip('?'), endpoint, status,
+                seconds * 1000, g.sql_seconds * 1000, queries, g.render_seconds * 1000)
@@ -0,0 +1,99 @@
+"""partition shows by month on start_time
+
+Revision ID: 2c7d9e4b1a58
+Revises: b71e4c2a9f03
+Create Date: 2026-10-18 13:02:37.215940
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2c7d9e4b1a58'
+down_revision = 'b71e4c2a9f03'
+branch_labels = None
+depends_on = None
+
+COLUMNS = 'id, artist_id, venue_id, start_time, updated_at'
+MONTHS_AHEAD = 12
+
+
+def _months(first, last):
+    month = datetime(first.year, first.month, 1)
+    while month <= last:
+        following = datetime(month.year + month.month // 12, month.month % 12 + 1, 1)
+        yield month, following
+        month = following
+
+
+def _create_indexes():
+    op.create_index('ix_shows_venue_id_start_time', 'shows', ['venue_id', 'start_time'])
+    op.create_index('ix_shows_artist_id_start_time', 'shows', ['artist_id', 'start_time'])
+    op.create_index('ix_shows_start_time_brin', 'shows', ['start_time'], postgresql_using='brin')
+
+
+def upgrade():
+    # The old table is copied, not converted in place: Postgres cannot turn
+    # an existing table into a partitioned one. Writes to shows are blocked
+    # until the copy commits.
+    op.rename_table('shows', 'shows_unpartitioned')
+    op.execute('ALTER TABLE shows_unpartitioned RENAME CONSTRAINT shows_pkey TO shows_unpartitioned_pkey')
+    for index in ('ix_shows_venue_id_start_time', 'ix_shows_artist_id_start_time', 'ix_shows_start_time_brin'):
+        op.drop_index(index, table_name='shows_unpartitioned')
+    op.execute('ALTER SEQUENCE shows_id_seq OWNED BY NONE')
+
+    op.create_table('shows',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('shows_id_seq')"), nullable=False),
+    sa.Column('artist_id', sa.Integer(), nullable=False),
+    sa.Column('venue_id', sa.Integer(), nullable=False),
+    sa.Column('start_time', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False,
+              server_default=sa.text("timezone('utc', now())")),
+    sa.ForeignKeyConstraint(['artist_id'], ['Artist.id'], ),
+    sa.ForeignKeyConstraint(['venue_id'], ['Venue.id'], ),
+    sa.PrimaryKeyConstraint('id', 'start_time'),
+    postgresql_partition_by='RANGE (start_time)'
+    )
+    op.execute('ALTER SEQUENCE shows_id_seq OWNED BY shows.id')
+
+    # One partition per month from the oldest show to MONTHS_AHEAD out;
+    # anything outside that lands in the default partition until
+    # `flask manage-partitions` creates its month.
+    now = datetime.now()
+    oldest = op.get_bind().execute(sa.text('SELECT min(start_time) FROM shows_unpartitioned')).scalar()
+    last = datetime(now.year + (now.month - 1 + MONTHS_AHEAD) // 12, (now.month - 1 + MONTHS_AHEAD) % 12 + 1, 1)
+    for month, following in _months(min(oldest or now, now), last):
+        op.execute(f"CREATE TABLE shows_p{month:%Y_%m} PARTITION OF shows "
+                   f"FOR VALUES FROM ('{month.isoformat(' ')}') TO ('{following.isoformat(' ')}')")
+    op.execute('CREATE TABLE shows_default PARTITION OF shows DEFAULT')
+
+    op.execute(f'INSERT INTO shows ({COLUMNS}) SELECT {COLUMNS} FROM shows_unpartitioned')
+    _create_indexes()
+    op.drop_table('shows_unpartitioned')
+
+
+def downgrade():
+    op.rename_table('shows', 'shows_partitioned')
+    op.execute('ALTER TABLE shows_partitioned RENAME CONSTRAINT shows_pkey TO shows_partitioned_pkey')
+    for index in ('ix_shows_venue_id_start_time', 'ix_shows_artist_id_start_time', 'ix_shows_start_time_brin'):
+        op.drop_index(index, table_name='shows_partitioned')
+    op.execute('ALTER SEQUENCE shows_id_seq OWNED BY NONE')
+
+    op.create_table('shows',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('shows_id_seq')"), nullable=False),
+    sa.Column('artist_id', sa.Integer(), nullable=False),
+    sa.Column('venue_id', sa.Integer(), nullable=False),
+    sa.Column('start_time', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False,
+              server_default=sa.text("timezone('utc', now())")),
+    sa.ForeignKeyConstraint(['artist_id'], ['Artist.id'], ),
+    sa.ForeignKeyConstraint(['venue_id'], ['Venue.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute('ALTER SEQUENCE shows_id_seq OWNED BY shows.id')
+    op.execute(f'INSERT INTO shows ({COLUMNS}) SELECT {COLUMNS} FROM shows_partitioned')
+    _create_indexes()
+    op.drop_table('shows_partitioned')
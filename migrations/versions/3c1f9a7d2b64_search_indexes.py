@@ -0,0 +1,54 @@
+"""add trigram indexes and search_vector columns
+
+Revision ID: 3c1f9a7d2b64
+Revises: f487e5e2ec6b
+Create Date: 2026-10-18 09:12:41.503118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c1f9a7d2b64'
+down_revision = 'f487e5e2ec6b'
+branch_labels = None
+depends_on = None
+
+
+# array_to_string() is only STABLE, so the generated columns go through an
+# IMMUTABLE wrapper. Weights rank name matches above location and genres.
+SEARCH_DOCUMENT_FUNCTION = """
+CREATE OR REPLACE FUNCTION fyyur_search_document(
+    name varchar, city varchar, state varchar, genres varchar[]
+) RETURNS tsvector
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT setweight(to_tsvector('simple', coalesce(name, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(city, '') || ' ' || coalesce(state, '')), 'B')
+        || setweight(to_tsvector('simple', coalesce(array_to_string(genres, ' '), '')), 'C')
+$$
+"""
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute(SEARCH_DOCUMENT_FUNCTION)
+    for table in ('Venue', 'Artist'):
+        lower = table.lower()
+        op.execute(
+            f'ALTER TABLE "{table}" ADD COLUMN search_vector tsvector '
+            f'GENERATED ALWAYS AS (fyyur_search_document(name, city, state, genres)) STORED'
+        )
+        op.create_index(f'ix_{lower}_search_vector', table, ['search_vector'],
+                        postgresql_using='gin')
+        op.create_index(f'ix_{lower}_name_trgm', table, ['name'],
+                        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+
+
+def downgrade():
+    for table in ('Artist', 'Venue'):
+        lower = table.lower()
+        op.drop_index(f'ix_{lower}_name_trgm', table_name=table)
+        op.drop_index(f'ix_{lower}_search_vector', table_name=table)
+        op.drop_column(table, 'search_vector')
+    op.execute('DROP FUNCTION IF EXISTS fyyur_search_document(varchar, varchar, varchar, varchar[])')
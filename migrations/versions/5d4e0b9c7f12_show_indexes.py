@@ -0,0 +1,35 @@
+"""add venue/artist/start_time indexes to shows
+
+Revision ID: 5d4e0b9c7f12
+Revises: 8e27b5c0d4a1
+Create Date: 2026-10-18 10:41:55.917304
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d4e0b9c7f12'
+down_revision = '8e27b5c0d4a1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CONCURRENTLY keeps shows writable while the indexes build, but cannot
+    # run inside the migration transaction.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_shows_venue_id_start_time', 'shows', ['venue_id', 'start_time'],
+                        postgresql_concurrently=True)
+        op.create_index('ix_shows_artist_id_start_time', 'shows', ['artist_id', 'start_time'],
+                        postgresql_concurrently=True)
+        op.create_index('ix_shows_start_time_brin', 'shows', ['start_time'],
+                        postgresql_using='brin', postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_shows_start_time_brin', table_name='shows', postgresql_concurrently=True)
+        op.drop_index('ix_shows_artist_id_start_time', table_name='shows', postgresql_concurrently=True)
+        op.drop_index('ix_shows_venue_id_start_time', table_name='shows', postgresql_concurrently=True)
@@ -0,0 +1,46 @@
+"""add venue_show_stats and artist_show_stats materialized views
+
+Revision ID: 7a3e5f1c9b26
+Revises: 2c7d9e4b1a58
+Create Date: 2026-10-18 13:48:12.604318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a3e5f1c9b26'
+down_revision = '2c7d9e4b1a58'
+branch_labels = None
+depends_on = None
+
+# Show times are stored as local wall-clock timestamps, so "now" is
+# localtimestamp, matching datetime.now() in the app.
+VIEW = """
+CREATE MATERIALIZED VIEW {view} AS
+SELECT e.id AS {key},
+       count(s.id) FILTER (WHERE s.start_time <= localtimestamp) AS past_shows_count,
+       count(s.id) FILTER (WHERE s.start_time > localtimestamp) AS upcoming_shows_count,
+       min(s.start_time) FILTER (WHERE s.start_time > localtimestamp) AS next_show_time,
+       localtimestamp AS refreshed_at
+FROM "{table}" e LEFT JOIN shows s ON s.{key} = e.id
+GROUP BY e.id
+"""
+
+VIEWS = (
+    ('venue_show_stats', 'Venue', 'venue_id'),
+    ('artist_show_stats', 'Artist', 'artist_id'),
+)
+
+
+def upgrade():
+    for view, table, key in VIEWS:
+        op.execute(VIEW.format(view=view, table=table, key=key))
+        # REFRESH ... CONCURRENTLY needs a unique index on the view.
+        op.create_index(f'ix_{view}_{key}', view, [key], unique=True)
+
+
+def downgrade():
+    for view, _, _ in VIEWS:
+        op.execute(f'DROP MATERIALIZED VIEW {view}')
@@ -0,0 +1,38 @@
+"""add upcoming_shows_count counters to Venue and Artist
+
+Revision ID: 8e27b5c0d4a1
+Revises: 3c1f9a7d2b64
+Create Date: 2026-10-18 10:03:17.284950
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e27b5c0d4a1'
+down_revision = '3c1f9a7d2b64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('Venue', sa.Column('upcoming_shows_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('Artist', sa.Column('upcoming_shows_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute("""
+        UPDATE "Venue" SET upcoming_shows_count = counts.n
+        FROM (SELECT venue_id, count(*) AS n FROM shows
+              WHERE start_time > now() GROUP BY venue_id) AS counts
+        WHERE "Venue".id = counts.venue_id
+    """)
+    op.execute("""
+        UPDATE "Artist" SET upcoming_shows_count = counts.n
+        FROM (SELECT artist_id, count(*) AS n FROM shows
+              WHERE start_time > now() GROUP BY artist_id) AS counts
+        WHERE "Artist".id = counts.artist_id
+    """)
+
+
+def downgrade():
+    op.drop_column('Artist', 'upcoming_shows_count')
+    op.drop_column('Venue', 'upcoming_shows_count')
@@ -0,0 +1,31 @@
+"""add GIN indexes on Venue and Artist genres
+
+Revision ID: 9d1b6e3f4c07
+Revises: 7a3e5f1c9b26
+Create Date: 2026-10-18 14:21:50.337162
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d1b6e3f4c07'
+down_revision = '7a3e5f1c9b26'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The default array GIN opclass serves genres @> ARRAY[...] filters.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_venue_genres', 'Venue', ['genres'],
+                        postgresql_using='gin', postgresql_concurrently=True)
+        op.create_index('ix_artist_genres', 'Artist', ['genres'],
+                        postgresql_using='gin', postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_artist_genres', table_name='Artist', postgresql_concurrently=True)
+        op.drop_index('ix_venue_genres', table_name='Venue', postgresql_concurrently=True)
@@ -0,0 +1,103 @@
+"""add show durations and prevent double-booking venues
+
+Revision ID: a6d2f8c3e1b5
+Revises: e5c8a2d7f619
+Create Date: 2026-10-18 16:02:41.337905
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d2f8c3e1b5'
+down_revision = 'e5c8a2d7f619'
+branch_labels = None
+depends_on = None
+
+MAX_SHOW_MINUTES = 24 * 60
+
+# Show times are local wall-clock timestamps, so slots are tsranges; the
+# function keeps the constraint and the queries using it on one expression.
+SHOW_SLOT_FUNCTION = """
+CREATE OR REPLACE FUNCTION fyyur_show_slot(start_time timestamp, duration_minutes integer)
+RETURNS tsrange
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT tsrange(start_time, start_time + duration_minutes * interval '1 minute')
+$$
+"""
+
+# Same as partitions.EXCLUSION_CONSTRAINT. btree_gist provides the GiST
+# equality operator for venue_id.
+EXCLUSION_CONSTRAINT = (
+    'ALTER TABLE "{name}" ADD CONSTRAINT "{name}_no_double_booking" '
+    'EXCLUDE USING gist (venue_id WITH =, fyyur_show_slot(start_time, duration_minutes) WITH &&)'
+)
+
+# The per-partition constraints cannot see a show in the neighbouring
+# month's partition, so a trigger checks those (at most two partitions,
+# thanks to the start_time bounds). Unlike the constraints it does not
+# serialize concurrent bookings across a month boundary.
+BOUNDARY_CHECK_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION fyyur_check_boundary_booking() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM shows s
+        WHERE s.venue_id = NEW.venue_id
+          AND s.start_time < upper(fyyur_show_slot(NEW.start_time, NEW.duration_minutes))
+          AND s.start_time > NEW.start_time - interval '{MAX_SHOW_MINUTES} minutes'
+          AND date_trunc('month', s.start_time) <> date_trunc('month', NEW.start_time)
+          AND fyyur_show_slot(s.start_time, s.duration_minutes)
+              && fyyur_show_slot(NEW.start_time, NEW.duration_minutes)
+    ) THEN
+        RAISE EXCEPTION 'venue % is already booked around %', NEW.venue_id, NEW.start_time
+            USING ERRCODE = 'exclusion_violation';
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+
+def _partitions():
+    return op.get_bind().execute(sa.text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'shows'::regclass ORDER BY c.relname"
+    )).scalars().all()
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    op.add_column('shows', sa.Column('duration_minutes', sa.SmallInteger(), server_default='120', nullable=False))
+    # Existing shows may overlap. Each one is cut short at the next show at
+    # its venue; same-time duplicates get 0 minutes, an empty slot that
+    # overlaps nothing.
+    op.execute(
+        'UPDATE shows s SET duration_minutes = '
+        'floor(extract(epoch FROM n.next_start - s.start_time) / 60) '
+        'FROM (SELECT id, start_time, lead(start_time) OVER '
+        '(PARTITION BY venue_id ORDER BY start_time, id) AS next_start FROM shows) n '
+        'WHERE s.id = n.id AND s.start_time = n.start_time '
+        "AND n.next_start < s.start_time + interval '120 minutes'"
+    )
+    op.create_check_constraint('ck_shows_duration_minutes', 'shows',
+                               f'duration_minutes BETWEEN 0 AND {MAX_SHOW_MINUTES}')
+    op.execute(SHOW_SLOT_FUNCTION)
+    for name in _partitions():
+        op.execute(EXCLUSION_CONSTRAINT.format(name=name))
+    op.execute(BOUNDARY_CHECK_FUNCTION)
+    op.execute(
+        'CREATE TRIGGER shows_boundary_booking AFTER INSERT OR UPDATE OF venue_id, start_time, '
+        'duration_minutes ON shows FOR EACH ROW EXECUTE FUNCTION fyyur_check_boundary_booking()'
+    )
+
+
+def downgrade():
+    op.execute('DROP TRIGGER shows_boundary_booking ON shows')
+    op.execute('DROP FUNCTION fyyur_check_boundary_booking()')
+    for name in _partitions():
+        op.execute(f'ALTER TABLE "{name}" DROP CONSTRAINT IF EXISTS "{name}_no_double_booking"')
+    op.execute('DROP FUNCTION fyyur_show_slot(timestamp, integer)')
+    op.drop_constraint('ck_shows_duration_minutes', 'shows', type_='check')
+    op.drop_column('shows', 'duration_minutes')
@@ -0,0 +1,27 @@
+"""add updated_at to Venue, Artist and shows
+
+Revision ID: b71e4c2a9f03
+Revises: 5d4e0b9c7f12
+Create Date: 2026-10-18 11:26:08.441872
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b71e4c2a9f03'
+down_revision = '5d4e0b9c7f12'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ('Venue', 'Artist', 'shows'):
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=False,
+                                       server_default=sa.text("timezone('utc', now())")))
+
+
+def downgrade():
+    for table in ('shows', 'Artist', 'Venue'):
+        op.drop_column(table, 'updated_at')
@@ -0,0 +1,28 @@
+"""add a (start_time, id) btree index to shows for the shows feed
+
+Revision ID: d3b9e6a4f7c2
+Revises: a6d2f8c3e1b5
+Create Date: 2026-10-18 21:24:08.151672
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3b9e6a4f7c2'
+down_revision = 'a6d2f8c3e1b5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The feed is keyset-paginated on (start_time, id). The BRIN index can
+    # find the rows but not return them in order, so without this index
+    # every page sorted all upcoming shows. Indexes on a partitioned table
+    # cannot be built CONCURRENTLY; each partition is built in turn.
+    op.create_index('ix_shows_start_time_id', 'shows', ['start_time', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_shows_start_time_id', table_name='shows')
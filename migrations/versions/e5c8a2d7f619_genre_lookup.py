@@ -0,0 +1,140 @@
+"""store genres as smallint ids into a genre lookup table
+
+Revision ID: e5c8a2d7f619
+Revises: 9d1b6e3f4c07
+Create Date: 2026-10-18 15:07:26.918450
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5c8a2d7f619'
+down_revision = '9d1b6e3f4c07'
+branch_labels = None
+depends_on = None
+
+# The genre choices in forms.py when this migration was written, in order.
+GENRES = [
+    'Alternative', 'Blues', 'Classical', 'Country', 'Electronic', 'Folk', 'Funk',
+    'Hip-Hop', 'Heavy Metal', 'Instrumental', 'Jazz', 'Musical Theatre', 'Pop',
+    'Punk', 'R&B', 'Reggae', 'Rock n Roll', 'Soul', 'Other',
+]
+
+TABLES = ('Venue', 'Artist')
+
+# Generated columns may only call IMMUTABLE functions, so the search
+# document cannot read the genre table; the names are copied into the
+# function instead. A migration that adds a genre must recreate it.
+GENRE_NAMES_FUNCTION = """
+CREATE OR REPLACE FUNCTION fyyur_genre_names(ids smallint[]) RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT string_agg((ARRAY[{names}]::varchar[])[id], ' ') FROM unnest(ids) AS id
+$$
+"""
+
+SEARCH_DOCUMENT_FUNCTION = """
+CREATE OR REPLACE FUNCTION fyyur_search_document(
+    name varchar, city varchar, state varchar, genres smallint[]
+) RETURNS tsvector
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT setweight(to_tsvector('simple', coalesce(name, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(city, '') || ' ' || coalesce(state, '')), 'B')
+        || setweight(to_tsvector('simple', coalesce(fyyur_genre_names(genres), '')), 'C')
+$$
+"""
+
+# As created by the search migration (3c1f9a7d2b64), for downgrades.
+TEXT_SEARCH_DOCUMENT_FUNCTION = """
+CREATE OR REPLACE FUNCTION fyyur_search_document(
+    name varchar, city varchar, state varchar, genres varchar[]
+) RETURNS tsvector
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT setweight(to_tsvector('simple', coalesce(name, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(city, '') || ' ' || coalesce(state, '')), 'B')
+        || setweight(to_tsvector('simple', coalesce(array_to_string(genres, ' '), '')), 'C')
+$$
+"""
+
+
+def _drop_search_and_genre_indexes():
+    for table in TABLES:
+        lower = table.lower()
+        op.drop_index(f'ix_{lower}_genres', table_name=table)
+        op.drop_index(f'ix_{lower}_search_vector', table_name=table)
+        op.drop_column(table, 'search_vector')
+
+
+def _add_search_and_genre_indexes():
+    for table in TABLES:
+        lower = table.lower()
+        op.execute(
+            f'ALTER TABLE "{table}" ADD COLUMN search_vector tsvector '
+            f'GENERATED ALWAYS AS (fyyur_search_document(name, city, state, genres)) STORED'
+        )
+        op.create_index(f'ix_{lower}_search_vector', table, ['search_vector'], postgresql_using='gin')
+        op.create_index(f'ix_{lower}_genres', table, ['genres'], postgresql_using='gin')
+
+
+def _vacuum():
+    # The column swap rewrites every row; VACUUM FULL compacts the tables
+    # so the smaller arrays actually shrink them.
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.execute(f'VACUUM FULL ANALYZE "{table}"')
+
+
+def upgrade():
+    genre = op.create_table('genre',
+    sa.Column('id', sa.SmallInteger(), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    # Names outside the choices (e.g. from older imports) are kept, with ids
+    # after the known ones. Ids stay dense for fyyur_genre_names().
+    stored = op.get_bind().execute(sa.text(
+        'SELECT unnest(genres) FROM "Venue" UNION SELECT unnest(genres) FROM "Artist"'
+    )).scalars().all()
+    names = GENRES + sorted(set(stored) - set(GENRES))
+    op.bulk_insert(genre, [{'id': id, 'name': name} for id, name in enumerate(names, 1)])
+
+    _drop_search_and_genre_indexes()
+    for table in TABLES:
+        op.add_column(table, sa.Column('genre_ids', postgresql.ARRAY(sa.SmallInteger())))
+        op.execute(
+            f'UPDATE "{table}" t SET genre_ids = ARRAY('
+            f'SELECT g.id FROM unnest(t.genres) WITH ORDINALITY AS n(name, position) '
+            f'JOIN genre g ON g.name = n.name ORDER BY n.position)'
+        )
+        op.drop_column(table, 'genres')
+        op.alter_column(table, 'genre_ids', new_column_name='genres', nullable=False)
+
+    op.execute('DROP FUNCTION fyyur_search_document(varchar, varchar, varchar, varchar[])')
+    literals = ', '.join("'" + name.replace("'", "''") + "'" for name in names)
+    op.execute(GENRE_NAMES_FUNCTION.format(names=literals))
+    op.execute(SEARCH_DOCUMENT_FUNCTION)
+    _add_search_and_genre_indexes()
+    _vacuum()
+
+
+def downgrade():
+    _drop_search_and_genre_indexes()
+    for table in TABLES:
+        op.add_column(table, sa.Column('genre_names', postgresql.ARRAY(sa.VARCHAR())))
+        op.execute(
+            f'UPDATE "{table}" t SET genre_names = ARRAY('
+            f'SELECT g.name FROM unnest(t.genres) WITH ORDINALITY AS n(id, position) '
+            f'JOIN genre g ON g.id = n.id ORDER BY n.position)'
+        )
+        op.drop_column(table, 'genres')
+        op.alter_column(table, 'genre_names', new_column_name='genres', nullable=False)
+
+    op.execute('DROP FUNCTION fyyur_search_document(varchar, varchar, varchar, smallint[])')
+    op.execute('DROP FUNCTION fyyur_genre_names(smallint[])')
+    op.execute(TEXT_SEARCH_DOCUMENT_FUNCTION)
+    _add_search_and_genre_indexes()
+    op.drop_table('genre')
+    _vacuum()
@@ -1,9 +1,30 @@
-from app import app
-from flask_sqlalchemy import SQLAlchemy
+from extensions import db
+from genres import GenreNames
+from sqlalchemy.dialects.postgresql import TSRANGE, TSVECTOR
 from datetime import datetime
 
 
-db = SQLAlchemy(app)
+# Server-side default for updated_at, matching datetime.utcnow in the ORM.
+UTC_NOW = db.text("timezone('utc', now())")
+
+# Maintained by Postgres from name, city, state and genres; see the
+# fyyur_search_document() function in the search and genre lookup migrations.
+SEARCH_DOCUMENT = "fyyur_search_document(name, city, state, genres)"
+
+# Longest show that can be booked. It also bounds how long before a time
+# window a show overlapping it can start, which keeps overlap queries to
+# the partitions around the window.
+MAX_SHOW_MINUTES = 24 * 60
+DEFAULT_SHOW_MINUTES = 120
+
+
+class Genre(db.Model):
+    """Lookup table behind the genres columns; see genres.py."""
+    __tablename__ = 'genre'
+
+    id = db.Column(db.SmallInteger, primary_key=True)
+    name = db.Column(db.String(50), nullable=False, unique=True)
+
 
 class Venue(db.Model):
     __tablename__ = 'Venue'
@@ -17,10 +38,23 @@ class Venue(db.Model):
     image_link = db.Column((db.String(500)), nullable=False)
     facebook_link = db.Column(db.String(120))
     website_link = db.Column(db.String(120))
-    genres = db.Column((db.ARRAY(db.String)), nullable=False)
+    genres = db.Column(GenreNames, nullable=False)
     seeking_talent = db.Column((db.Boolean), nullable=False)
     seeking_description = db.Column(db.String())
+    search_vector = db.Column(TSVECTOR, db.Computed(SEARCH_DOCUMENT, persisted=True))
+    # Denormalized; maintained by the show write paths and reconciled
+    # periodically by `flask reconcile-show-counts`.
+    upcoming_shows_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow,
+                           onupdate=datetime.utcnow, server_default=UTC_NOW)
     shows = db.relationship("Show", backref="venues", lazy=True)
+
+    __table_args__ = (
+        db.Index('ix_venue_search_vector', 'search_vector', postgresql_using='gin'),
+        db.Index('ix_venue_name_trgm', 'name', postgresql_using='gin',
+                 postgresql_ops={'name': 'gin_trgm_ops'}),
+        db.Index('ix_venue_genres', 'genres', postgresql_using='gin'),
+    )
     
 
 
@@ -32,23 +66,87 @@ class Artist(db.Model):
     city = db.Column((db.String(120)), nullable=False)
     state = db.Column((db.String(120)), nullable=False)
     phone = db.Column(db.Integer, nullable=False)
-    genres = db.Column((db.ARRAY(db.String)), nullable=False)
+    genres = db.Column(GenreNames, nullable=False)
     image_link = db.Column(db.String(500), nullable=False)
     facebook_link = db.Column(db.String(120))
     website_link = db.Column(db.String(120))
     seeking_venue = db.Column((db.Boolean), nullable=False)
     seeking_description = db.Column(db.String(120)) 
+    search_vector = db.Column(TSVECTOR, db.Computed(SEARCH_DOCUMENT, persisted=True))
+    upcoming_shows_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow,
+                           onupdate=datetime.utcnow, server_default=UTC_NOW)
     shows = db.relationship("Show", backref="artists", lazy=True)
 
+    __table_args__ = (
+        db.Index('ix_artist_search_vector', 'search_vector', postgresql_using='gin'),
+        db.Index('ix_artist_name_trgm', 'name', postgresql_using='gin',
+                 postgresql_ops={'name': 'gin_trgm_ops'}),
+        db.Index('ix_artist_genres', 'genres', postgresql_using='gin'),
+    )
+
 
 class Show(db.Model):
     __tablename__ = "shows"
-    id = db.Column(db.Integer, primary_key=True)
+    # Range-partitioned by month on start_time (see partitions.py), so
+    # start_time has to be part of the primary key.
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     artist_id = db.Column(db.Integer, db.ForeignKey("Artist.id"), nullable=False)
     venue_id = db.Column(db.Integer, db.ForeignKey("Venue.id"), nullable=False)
-    start_time = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    start_time = db.Column(db.DateTime, primary_key=True, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow,
+                           onupdate=datetime.utcnow, server_default=UTC_NOW)
+    # Shows booked before durations were recorded may have 0 (see the
+    # double-booking migration); the form asks for at least a minute.
+    duration_minutes = db.Column(db.SmallInteger, nullable=False, default=DEFAULT_SHOW_MINUTES,
+                                 server_default=str(DEFAULT_SHOW_MINUTES))
+
+    # Double-booking is prevented by an exclusion constraint on each
+    # partition (Postgres has none on the parent), created by the migration
+    # and by partitions.create_partition(), over venue_id and slot().
+    __table_args__ = (
+        db.CheckConstraint(f'duration_minutes BETWEEN 0 AND {MAX_SHOW_MINUTES}',
+                           name='ck_shows_duration_minutes'),
+        db.Index('ix_shows_venue_id_start_time', 'venue_id', 'start_time'),
+        db.Index('ix_shows_artist_id_start_time', 'artist_id', 'start_time'),
+        db.Index('ix_shows_start_time_brin', 'start_time', postgresql_using='brin'),
+        db.Index('ix_shows_start_time_id', 'start_time', 'id'),
+        {'postgresql_partition_by': 'RANGE (start_time)'},
+    )
     
+    @classmethod
+    def slot(cls):
+        """The tsrange a show occupies, as indexed by the exclusion constraints."""
+        return db.func.fyyur_show_slot(cls.start_time, cls.duration_minutes, type_=TSRANGE)
+
     def __repr__(self):
         return f"<Show id={self.id} artist_id={self.artist_id} venue_id={self.venue_id} start_time={self.start_time} "
  
- 
\ No newline at end of file
+ 
+
+# Read-only mappings of the show stats materialized views (see show_stats.py).
+# They live in their own MetaData so create_all() and migration autogenerate
+# leave them alone; only REFRESH MATERIALIZED VIEW writes their rows.
+views = db.MetaData()
+
+
+class VenueShowStats(db.Model):
+    __table__ = db.Table(
+        'venue_show_stats', views,
+        db.Column('venue_id', db.Integer, primary_key=True),
+        db.Column('past_shows_count', db.Integer, nullable=False),
+        db.Column('upcoming_shows_count', db.Integer, nullable=False),
+        db.Column('next_show_time', db.DateTime),
+        db.Column('refreshed_at', db.DateTime, nullable=False),
+    )
+
+
+class ArtistShowStats(db.Model):
+    __table__ = db.Table(
+        'artist_show_stats', views,
+        db.Column('artist_id', db.Integer, primary_key=True),
+        db.Column('past_shows_count', db.Integer, nullable=False),
+        db.Column('upcoming_shows_count', db.Integer, nullable=False),
+        db.Column('next_show_time', db.DateTime),
+        db.Column('refreshed_at', db.DateTime, nullable=False),
+    )
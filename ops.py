@@ -0,0 +1,46 @@
+from flask import Blueprint, Response, jsonify
+
+import dbpool
+import instrumentation
+from cache import render_cache
+from facets import facet_cache
+from models import db
+from show_stats import stats_refresher
+
+
+bp = Blueprint('ops', __name__)
+
+
+@bp.route('/_stats/render-cache')
+def render_cache_stats():
+    return jsonify(render_cache.stats())
+
+
+@bp.route('/_stats/facet-cache')
+def facet_cache_stats():
+    return jsonify(facet_cache.stats())
+
+
+@bp.route('/_stats/pool')
+def pool_stats():
+    return jsonify(dbpool.pool_stats.snapshot(db.engine.pool))
+
+
+@bp.route('/_stats/show-stats')
+def show_stats_refreshes():
+    return jsonify(stats_refresher.stats())
+
+
+@bp.route('/metrics')
+def metrics():
+    cache = render_cache.stats()
+    pool = dbpool.pool_stats.snapshot(db.engine.pool)
+    body = instrumentation.metrics.exposition(gauges=[
+        ("fyyur_render_cache", "Render cache counters and occupancy.",
+         {(("stat", key),): value for key, value in cache.items()}),
+        ("fyyur_facet_cache", "Genre facet cache counters and occupancy.",
+         {(("stat", key),): value for key, value in facet_cache.stats().items()}),
+        ("fyyur_db_pool", "Connection pool checkout statistics.",
+         {(("stat", key),): value for key, value in pool.items()}),
+    ])
+    return Response(body, mimetype='text/plain; version=0.0.4')
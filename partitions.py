@@ -0,0 +1,132 @@
+import re
+from datetime import datetime
+
+from sqlalchemy import text
+
+from dbpool import maintenance_transaction
+from models import db
+
+
+PARENT = 'shows'
+DEFAULT_PARTITION = 'shows_default'
+# Columns in table order, for moving rows out of the default partition.
+COLUMNS = 'id, artist_id, venue_id, start_time, updated_at, duration_minutes'
+# Postgres cannot put this on the parent, so every partition gets its own;
+# see the double-booking migration for shows crossing partitions.
+EXCLUSION_CONSTRAINT = (
+    'ALTER TABLE "{name}" ADD CONSTRAINT "{name}_no_double_booking" '
+    'EXCLUDE USING gist (venue_id WITH =, fyyur_show_slot(start_time, duration_minutes) WITH &&)'
+)
+
+_BOUNDS = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+#----------------------------------------------------------------------------#
+# Months.
+#----------------------------------------------------------------------------#
+
+def month_start(value):
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"{PARENT}_p{month:%Y_%m}"
+
+
+#----------------------------------------------------------------------------#
+# Partition management.
+#----------------------------------------------------------------------------#
+
+def monthly_partitions(connection):
+    """{month: partition name} for every monthly partition of shows."""
+    rows = connection.execute(text(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+        "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = CAST(:parent AS regclass)"
+    ), {'parent': PARENT})
+    partitions = {}
+    for name, bounds in rows:
+        match = _BOUNDS.search(bounds)
+        if match:
+            partitions[month_start(datetime.fromisoformat(match.group(1)))] = name
+    return partitions
+
+
+def create_partition(connection, month):
+    """Create and attach the partition for `month`.
+
+    The partition is built detached, filled with any rows for that month
+    that landed in the default partition, then attached; attaching a range
+    that the default partition still holds rows for would fail. The
+    no-double-booking constraint goes on before the rows move in.
+    """
+    name = partition_name(month)
+    lower, upper = month.isoformat(' '), add_months(month, 1).isoformat(' ')
+    connection.execute(text(
+        f'CREATE TABLE "{name}" (LIKE "{PARENT}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'))
+    connection.execute(text(EXCLUSION_CONSTRAINT.format(name=name)))
+    connection.execute(text(
+        f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" '
+        f'WHERE start_time >= :lower AND start_time < :upper RETURNING {COLUMNS}) '
+        f'INSERT INTO "{name}" ({COLUMNS}) SELECT {COLUMNS} FROM moved'
+    ), {'lower': lower, 'upper': upper})
+    connection.execute(text(
+        f'ALTER TABLE "{PARENT}" ATTACH PARTITION "{name}" '
+        f"FOR VALUES FROM ('{lower}') TO ('{upper}')"))
+    return name
+
+
+def ensure_partitions(months_ahead, since=None, now=None):
+    """Create any missing partitions up to `months_ahead` months out.
+
+    Partitions start from this month, or from the month of `since` when
+    loading history.
+    """
+    current = month_start(now or datetime.now())
+    month = month_start(min(since, current)) if since else current
+    created = []
+    with maintenance_transaction(db.engine) as connection:
+        existing = monthly_partitions(connection)
+    while month <= add_months(current, months_ahead):
+        if month not in existing:
+            with maintenance_transaction(db.engine) as connection:
+                created.append(create_partition(connection, month))
+        month = add_months(month, 1)
+    return created
+
+
+def archive_partitions(months_kept, schema='archive', drop=False, now=None):
+    """Detach partitions that ended more than `months_kept` months ago.
+
+    Detached partitions are moved to `schema`, where they can still be
+    queried or dumped, or dropped with `drop=True`.
+    """
+    cutoff = add_months(month_start(now or datetime.now()), -months_kept)
+    archived = []
+    with maintenance_transaction(db.engine) as connection:
+        existing = monthly_partitions(connection)
+    for month, name in sorted(existing.items()):
+        if add_months(month, 1) > cutoff:
+            break
+        with maintenance_transaction(db.engine) as connection:
+            connection.execute(text(f'ALTER TABLE "{PARENT}" DETACH PARTITION "{name}"'))
+            if drop:
+                connection.execute(text(f'DROP TABLE "{name}"'))
+            else:
+                # Archived shows must not stop venues and artists from being
+                # deleted, so the detached table keeps no foreign keys.
+                foreign_keys = connection.execute(text(
+                    "SELECT conname FROM pg_constraint "
+                    "WHERE conrelid = CAST(:name AS regclass) AND contype = 'f'"
+                ), {'name': f'"{name}"'}).scalars().all()
+                for constraint in foreign_keys:
+                    connection.execute(text(f'ALTER TABLE "{name}" DROP CONSTRAINT "{constraint}"'))
+                connection.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{schema}"'))
+                connection.execute(text(f'ALTER TABLE "{name}" SET SCHEMA "{schema}"'))
+        archived.append(name)
+    return archived
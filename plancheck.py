@@ -0,0 +1,108 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event, func
+
+from models import db, Venue, Artist
+from partitions import PARENT, DEFAULT_PARTITION
+
+
+# Relations smaller than this are expected to be scanned whole.
+MIN_PAGES = 64
+
+
+#----------------------------------------------------------------------------#
+# Query-plan regression checks.
+#----------------------------------------------------------------------------#
+
+def route_checks():
+    """(method, path, form data, relations that must not be seq-scanned).
+
+    Entity pages are checked for the busiest (lowest id in seeded data)
+    and the quietest (highest id) venue and artist.
+    """
+    venue_ids = db.session.query(func.min(Venue.id), func.max(Venue.id)).one()
+    artist_ids = db.session.query(func.min(Artist.id), func.max(Artist.id)).one()
+    checks = [
+        ('GET', '/venues', None, {'shows'}),
+        ('GET', '/shows', None, {'shows'}),
+        ('GET', '/venues?genre=Jazz', None, {'Venue'}),
+        ('GET', '/artists?genre=Jazz', None, {'Artist'}),
+        ('POST', '/venues/search', {'search_term': 'music'}, {'Venue', 'shows'}),
+        ('POST', '/artists/search', {'search_term': 'music'}, {'Artist', 'shows'}),
+    ]
+    for venue_id in sorted(set(venue_ids) - {None}):
+        checks.append(('GET', f'/venues/{venue_id}', None, {'Venue', 'shows'}))
+        checks.append(('GET', f'/api/v1/venues/{venue_id}/free-slots', None, {'shows'}))
+    for artist_id in sorted(set(artist_ids) - {None}):
+        checks.append(('GET', f'/artists/{artist_id}', None, {'Artist', 'shows'}))
+    return checks
+
+
+@contextmanager
+def captured_selects(engine):
+    """Collect every SELECT statement and its parameters run on `engine`."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def parent_relation(name):
+    """Report a scan of a shows partition as a scan of shows."""
+    if name == DEFAULT_PARTITION or name.startswith(f'{PARENT}_p'):
+        return PARENT
+    return name
+
+
+def seq_scans(plan):
+    if plan.get('Node Type') == 'Seq Scan':
+        yield plan['Relation Name']
+    for child in plan.get('Plans', ()):
+        yield from seq_scans(child)
+
+
+def explain(statement, parameters, min_pages=MIN_PAGES):
+    """Return the relations Postgres would seq-scan for `statement`.
+
+    Plans come from the default planner settings, so the check is only as
+    good as the data: run it against a database seeded at a realistic size
+    and analyzed. Relations under `min_pages` pages (the empty default
+    partition, a month that has just begun) are left out, since scanning
+    them whole is cheaper than any index.
+    """
+    connection = db.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + statement, parameters)
+        plan = cursor.fetchone()[0]
+        scanned = set(seq_scans(plan[0]['Plan']))
+        cursor.execute('SELECT relname, relpages FROM pg_class WHERE relname = ANY(%s)', (list(scanned),))
+        pages = dict(cursor.fetchall())
+        connection.rollback()
+    finally:
+        connection.close()
+    return {parent_relation(name) for name in scanned if pages.get(name, 0) >= min_pages}
+
+
+def check_query_plans(app, min_pages=MIN_PAGES):
+    """Drive each read route and return (path, relation, statement) failures."""
+    failures = []
+    client = app.test_client()
+    with app.app_context():
+        checks = route_checks()
+        engine = db.engine
+    for method, path, data, relations in checks:
+        with captured_selects(engine) as statements:
+            client.open(path, method=method, data=data)
+        with app.app_context():
+            for statement, parameters in statements:
+                for relation in explain(statement, parameters, min_pages) & relations:
+                    failures.append((path, relation, statement))
+    return failures
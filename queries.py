@@ -0,0 +1,477 @@
+import binascii
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime, timedelta
+from itertools import groupby
+
+from sqlalchemy import case, func, tuple_, update
+
+from genres import GenreName
+from models import db, MAX_SHOW_MINUTES, Artist, Venue, Show, VenueShowStats, ArtistShowStats
+
+
+SHOW_STATS = {
+    Venue: (VenueShowStats, VenueShowStats.venue_id),
+    Artist: (ArtistShowStats, ArtistShowStats.artist_id),
+}
+
+
+def _with_upcoming_count(query, model, max_stats_age):
+    """Join the show stats view and add an `num_upcoming_shows` column.
+
+    The view's count is used while it was refreshed less than
+    `max_stats_age` seconds ago; past that, the counter column is. The age
+    is computed by the database, on the same clock that stamped
+    refreshed_at, so app server time zones and clock skew do not matter.
+    """
+    stats, key = SHOW_STATS[model]
+    fresh = stats.refreshed_at > func.localtimestamp() - timedelta(seconds=max_stats_age)
+    count = case((fresh, stats.upcoming_shows_count), else_=model.upcoming_shows_count)
+    return query.outerjoin(stats, key == model.id).add_columns(count.label('num_upcoming_shows'))
+
+
+#----------------------------------------------------------------------------#
+# Listings.
+#----------------------------------------------------------------------------#
+
+def venue_areas(max_stats_age=300, genres=()):
+    """Build the `areas` structure used by pages/venues.html in one query.
+
+    Upcoming-show counts are read from the show stats view (or the counter
+    column when the view is stale), and rows come back ordered by
+    (state, city, name) so they can be folded into areas in Python.
+    Only venues with every genre in `genres` are included.
+    """
+    rows = _with_upcoming_count(db.session.query(
+        Venue.id,
+        Venue.name,
+        Venue.city,
+        Venue.state,
+    ), Venue, max_stats_age).filter(*with_genres(Venue, genres)).order_by(
+        Venue.state, Venue.city, Venue.name, Venue.id
+    ).all()
+
+    areas = []
+    for (state, city), venues in groupby(rows, key=lambda row: (row.state, row.city)):
+        areas.append({
+            "city": city,
+            "state": state,
+            "venues": [{
+                "id": row.id,
+                "name": row.name,
+                "num_upcoming_shows": row.num_upcoming_shows,
+            } for row in venues],
+        })
+    return areas
+
+
+def artist_list(genres=()):
+    """Artists for pages/artists.html, restricted to those with every genre in `genres`."""
+    rows = db.session.query(Artist.id, Artist.name).filter(
+        *with_genres(Artist, genres)).order_by(Artist.id)
+    return [{"id": row.id, "name": row.name} for row in rows]
+
+
+#----------------------------------------------------------------------------#
+# Genre facets.
+#----------------------------------------------------------------------------#
+
+def with_genres(model, genres):
+    """Filter criteria for rows having all of `genres`.
+
+    `genres @> ARRAY[...]` is answered from the GIN index on genres.
+    """
+    return [model.genres.contains(list(genres))] if genres else []
+
+
+def genre_facets(model, genres=()):
+    """[(genre, count)] across the rows matching `genres`, most common first.
+
+    One query: the matching rows' arrays are unnested and grouped by
+    genre id, and ids are mapped back to names in Python.
+    """
+    unnested = db.session.query(func.unnest(model.genres, type_=GenreName).label('genre')).filter(
+        *with_genres(model, genres)).subquery()
+    count = func.count().label('count')
+    return db.session.query(unnested.c.genre, count).group_by(unnested.c.genre).order_by(
+        count.desc(), unnested.c.genre).all()
+
+
+#----------------------------------------------------------------------------#
+# Detail pages.
+#----------------------------------------------------------------------------#
+
+def _partition_shows(query, columns):
+    """Split joined show rows into past/upcoming lists.
+
+    The split flag and the per-partition counts are computed by the database
+    alongside the joined columns, so a detail page costs one show query no
+    matter how many shows the entity has.
+    """
+    upcoming = Show.start_time > datetime.now()
+    rows = query.add_columns(
+        upcoming.label('upcoming'),
+        func.count(Show.id).over(partition_by=upcoming).label('partition_count'),
+    ).order_by(Show.start_time, Show.id).all()
+
+    shows = {"past_shows": [], "upcoming_shows": [],
+             "past_shows_count": 0, "upcoming_shows_count": 0}
+    for row in rows:
+        kind = "upcoming" if row.upcoming else "past"
+        shows[kind + "_shows"].append({key: getattr(row, key) for key in columns})
+        shows[kind + "_shows_count"] = row.partition_count
+    return shows
+
+
+VENUE_DETAIL_COLUMNS = {
+    'id': Venue.id,
+    'name': Venue.name,
+    'genres': Venue.genres,
+    'address': Venue.address,
+    'city': Venue.city,
+    'state': Venue.state,
+    'phone': Venue.phone,
+    'website': Venue.website_link,
+    'facebook_link': Venue.facebook_link,
+    'seeking_talent': Venue.seeking_talent,
+    'seeking_description': Venue.seeking_description,
+    'image_link': Venue.image_link,
+}
+
+ARTIST_DETAIL_COLUMNS = {
+    'id': Artist.id,
+    'name': Artist.name,
+    'genres': Artist.genres,
+    'city': Artist.city,
+    'state': Artist.state,
+    'phone': Artist.phone,
+    'website': Artist.website_link,
+    'facebook_link': Artist.facebook_link,
+    'seeking_venue': Artist.seeking_venue,
+    'seeking_description': Artist.seeking_description,
+    'image_link': Artist.image_link,
+}
+
+DETAIL_SHOW_FIELDS = ('past_shows', 'upcoming_shows', 'past_shows_count', 'upcoming_shows_count')
+VENUE_DETAIL_FIELDS = tuple(VENUE_DETAIL_COLUMNS) + DETAIL_SHOW_FIELDS
+ARTIST_DETAIL_FIELDS = tuple(ARTIST_DETAIL_COLUMNS) + DETAIL_SHOW_FIELDS
+
+
+def _entity_detail(model, columns, entity_id, fields, shows, show_columns, fk):
+    """`fields` of one venue or artist, or None if it is missing.
+
+    Only the requested columns are selected, the show lists are only
+    queried when one of them is requested, and the counts alone cost one
+    grouped count.
+    """
+    fields = list(columns) + list(DETAIL_SHOW_FIELDS) if fields is None else fields
+    selected = {key: columns[key] for key in fields if key in columns}
+    row = db.session.query(
+        model.id.label('_id'), *[column.label(key) for key, column in selected.items()]
+    ).filter(model.id == entity_id).first()
+    if row is None:
+        return None
+    data = {key: getattr(row, key) for key in selected}
+    if 'past_shows' in fields or 'upcoming_shows' in fields:
+        data.update(_partition_shows(shows, show_columns))
+    elif 'past_shows_count' in fields or 'upcoming_shows_count' in fields:
+        upcoming = Show.start_time > datetime.now()
+        counts = dict(db.session.query(upcoming, func.count(Show.id)).filter(
+            fk == entity_id).group_by(upcoming).all())
+        data.update(past_shows_count=counts.get(False, 0), upcoming_shows_count=counts.get(True, 0))
+    return data
+
+
+def venue_detail(venue_id, fields=None):
+    """Return the show_venue.html payload, or None if the venue is missing.
+
+    With `fields` (names from VENUE_DETAIL_FIELDS) only those are loaded.
+    """
+    shows = db.session.query(
+        Show.artist_id.label('artist_id'),
+        Artist.name.label('artist_name'),
+        Artist.image_link.label('artist_image_link'),
+        Show.start_time.label('start_time'),
+    ).join(Artist, Show.artist_id == Artist.id).filter(Show.venue_id == venue_id)
+    return _entity_detail(Venue, VENUE_DETAIL_COLUMNS, venue_id, fields, shows, (
+        "artist_id", "artist_name", "artist_image_link", "start_time"), Show.venue_id)
+
+
+def artist_detail(artist_id, fields=None):
+    """Return the show_artist.html payload, or None if the artist is missing.
+
+    With `fields` (names from ARTIST_DETAIL_FIELDS) only those are loaded.
+    """
+    shows = db.session.query(
+        Show.venue_id.label('venue_id'),
+        Venue.name.label('venue_name'),
+        Venue.image_link.label('venue_image_link'),
+        Show.start_time.label('start_time'),
+    ).join(Venue, Show.venue_id == Venue.id).filter(Show.artist_id == artist_id)
+    return _entity_detail(Artist, ARTIST_DETAIL_COLUMNS, artist_id, fields, shows, (
+        "venue_id", "venue_name", "venue_image_link", "start_time"), Show.artist_id)
+
+
+#----------------------------------------------------------------------------#
+# Shows feed.
+#----------------------------------------------------------------------------#
+
+def encode_cursor(start_time, show_id):
+    raw = "%s|%d" % (start_time.isoformat(), show_id)
+    return urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError on malformed input."""
+    try:
+        raw = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        start_time, show_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(start_time), int(show_id)
+    except (TypeError, UnicodeDecodeError, binascii.Error) as e:
+        raise ValueError("invalid cursor") from e
+
+
+SHOW_FEED_COLUMNS = {
+    'id': Show.id,
+    'venue_id': Show.venue_id,
+    'venue_name': Venue.name,
+    'artist_id': Show.artist_id,
+    'artist_name': Artist.name,
+    'artist_image_link': Artist.image_link,
+    'start_time': Show.start_time,
+    'duration_minutes': Show.duration_minutes,
+}
+
+
+def shows_page(cursor=None, limit=30, upcoming_only=True, fields=None):
+    """Return one page of the shows feed and the cursor of the next page.
+
+    Pages are keyed on (start_time, id) so each page is an index range scan
+    rather than an OFFSET over everything before it. Artist and venue columns
+    are joined into the same query. `fields` restricts the selected columns
+    to a subset of SHOW_FEED_COLUMNS.
+    """
+    fields = list(fields or SHOW_FEED_COLUMNS)
+    selected = fields + [key for key in ('id', 'start_time') if key not in fields]
+    query = db.session.query(
+        *[SHOW_FEED_COLUMNS[key].label(key) for key in selected]
+    ).select_from(Show).join(Venue, Show.venue_id == Venue.id).join(Artist, Show.artist_id == Artist.id)
+
+    if upcoming_only:
+        query = query.filter(Show.start_time > datetime.now())
+    if cursor is not None:
+        start_time, show_id = decode_cursor(cursor)
+        # The plain start_time bound is redundant with the row comparison,
+        # but Postgres only prunes partitions on the plain one.
+        query = query.filter(Show.start_time >= start_time,
+                             tuple_(Show.start_time, Show.id) > (start_time, show_id))
+
+    rows = query.order_by(Show.start_time, Show.id).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].start_time, rows[-1].id)
+    return [{key: getattr(row, key) for key in fields} for row in rows], next_cursor
+
+
+VENUE_COLUMNS = {
+    'id': Venue.id,
+    'name': Venue.name,
+    'city': Venue.city,
+    'state': Venue.state,
+    'address': Venue.address,
+    'phone': Venue.phone,
+    'genres': Venue.genres,
+    'image_link': Venue.image_link,
+    'facebook_link': Venue.facebook_link,
+    'website_link': Venue.website_link,
+    'seeking_talent': Venue.seeking_talent,
+    'seeking_description': Venue.seeking_description,
+    'upcoming_shows_count': Venue.upcoming_shows_count,
+    'updated_at': Venue.updated_at,
+}
+
+ARTIST_COLUMNS = {
+    'id': Artist.id,
+    'name': Artist.name,
+    'city': Artist.city,
+    'state': Artist.state,
+    'phone': Artist.phone,
+    'genres': Artist.genres,
+    'image_link': Artist.image_link,
+    'facebook_link': Artist.facebook_link,
+    'website_link': Artist.website_link,
+    'seeking_venue': Artist.seeking_venue,
+    'seeking_description': Artist.seeking_description,
+    'upcoming_shows_count': Artist.upcoming_shows_count,
+    'updated_at': Artist.updated_at,
+}
+
+
+def entity_page(model, columns, cursor=None, limit=50):
+    """One id-ordered page of venues or artists, selecting only `columns`.
+
+    `columns` maps output names to model columns. The cursor is the last
+    id of the previous page.
+    """
+    query = db.session.query(
+        model.id.label('_cursor'), *[column.label(key) for key, column in columns.items()])
+    if cursor is not None:
+        query = query.filter(model.id > int(cursor))
+    rows = query.order_by(model.id).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = str(rows[-1]._cursor)
+    return [{key: getattr(row, key) for key in columns} for row in rows], next_cursor
+
+
+#----------------------------------------------------------------------------#
+# Search.
+#----------------------------------------------------------------------------#
+
+def search(model, search_term, limit=50, max_stats_age=300):
+    """Relevance-ranked, capped search over venues or artists.
+
+    Substring matches on the name go through the trigram GIN index and
+    word matches on name, city, state and genres go through the
+    search_vector GIN index, so neither side needs a sequential scan.
+    Upcoming-show counts come from the show stats view, as in venue_areas().
+    """
+    pattern = "%" + search_term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    tsquery = func.plainto_tsquery('simple', search_term)
+    rank = func.ts_rank(model.search_vector, tsquery) + func.similarity(model.name, search_term)
+
+    rows = _with_upcoming_count(db.session.query(model.id, model.name), model, max_stats_age).filter(
+        model.name.ilike(pattern, escape="\\") | model.search_vector.op('@@')(tsquery)
+    ).order_by(rank.desc(), model.name, model.id).limit(limit).all()
+
+    data = [{
+        "id": row.id,
+        "name": row.name,
+        "num_upcoming_shows": row.num_upcoming_shows,
+    } for row in rows]
+    return {"count": len(data), "data": data}
+
+
+#----------------------------------------------------------------------------#
+# Venue availability.
+#----------------------------------------------------------------------------#
+
+def venue_free_slots(venue_id, start, end, min_minutes=60):
+    """(start, end) gaps of at least `min_minutes` between a venue's shows.
+
+    Booked slots are found with `&&` on Show.slot(), which the GiST index
+    behind the no-double-booking constraints answers; the start_time bounds
+    let Postgres skip partitions that cannot hold an overlapping show.
+    """
+    slot = Show.slot()
+    booked = db.session.query(func.lower(slot), func.upper(slot)).filter(
+        Show.venue_id == venue_id,
+        slot.overlaps(func.tsrange(start, end)),
+        Show.start_time > start - timedelta(minutes=MAX_SHOW_MINUTES),
+        Show.start_time < end,
+    ).order_by(Show.start_time)
+
+    minimum = timedelta(minutes=min_minutes)
+    free, free_from = [], start
+    for booked_from, booked_to in booked:
+        if booked_from - free_from >= minimum:
+            free.append((free_from, booked_from))
+        free_from = max(free_from, booked_to)
+    if end - free_from >= minimum:
+        free.append((free_from, end))
+    return free
+
+
+#----------------------------------------------------------------------------#
+# Upcoming-show counters.
+#----------------------------------------------------------------------------#
+
+def bump_upcoming_show_counts(venue_id, artist_id, delta=1):
+    """Adjust the venue and artist counters inside the caller's transaction."""
+    Venue.query.filter(Venue.id == venue_id).update(
+        {Venue.upcoming_shows_count: Venue.upcoming_shows_count + delta},
+        synchronize_session=False)
+    Artist.query.filter(Artist.id == artist_id).update(
+        {Artist.upcoming_shows_count: Artist.upcoming_shows_count + delta},
+        synchronize_session=False)
+
+
+def delete_venue_shows(venue_id):
+    """Delete a venue's shows and take its upcoming ones off artist counters.
+
+    Every artist that loses a show is updated, even with nothing to
+    decrement, so its updated_at moves and cached validators go stale.
+    """
+    counts = db.session.query(
+        Show.artist_id.label('artist_id'),
+        func.count(Show.id).filter(Show.start_time > datetime.now()).label('n'),
+    ).filter(Show.venue_id == venue_id).group_by(Show.artist_id).subquery()
+    db.session.execute(
+        update(Artist.__table__)
+        .values(upcoming_shows_count=Artist.upcoming_shows_count - counts.c.n)
+        .where(Artist.id == counts.c.artist_id)
+    )
+    Show.query.filter(Show.venue_id == venue_id).delete(synchronize_session=False)
+
+
+def reconcile_upcoming_show_counts():
+    """Recompute every counter from the shows table.
+
+    Counters are only incremented and decremented by writes, so shows that
+    have since started are still counted until this runs. Upcoming shows
+    are counted with one GROUP BY per table rather than per row, which
+    would probe every future partition once per venue and artist. Only
+    rows whose count actually changed are updated. Returns the number of
+    rows fixed.
+    """
+    fixed = 0
+    now = datetime.now()
+    for model, fk in ((Venue, Show.venue_id), (Artist, Show.artist_id)):
+        upcoming = db.session.query(fk.label('id'), func.count().label('n')).filter(
+            Show.start_time > now).group_by(fk).subquery()
+        actual = db.session.query(
+            model.id.label('id'),
+            func.coalesce(upcoming.c.n, 0).label('n'),
+        ).outerjoin(upcoming, upcoming.c.id == model.id).subquery()
+        fixed += db.session.execute(
+            update(model.__table__)
+            .values(upcoming_shows_count=actual.c.n)
+            .where(model.id == actual.c.id, model.upcoming_shows_count != actual.c.n)
+        ).rowcount
+    db.session.commit()
+    return fixed
+
+
+#----------------------------------------------------------------------------#
+# Page versions.
+#----------------------------------------------------------------------------#
+
+def _page_version(model, fk, other, other_fk, entity_id):
+    now = datetime.now()
+    return db.session.query(
+        model.updated_at,
+        func.max(Show.updated_at),
+        func.max(other.updated_at),
+        func.count(Show.id),
+        func.count(Show.id).filter(Show.start_time > now),
+        func.max(Show.start_time).filter(Show.start_time <= now),
+    ).outerjoin(Show, fk == model.id).outerjoin(other, other_fk == other.id).filter(
+        model.id == entity_id
+    ).group_by(model.id).first()
+
+
+def venue_page_version(venue_id):
+    """Cheap probe of everything show_venue.html depends on.
+
+    Returns None for a missing venue, otherwise a tuple of the venue, show
+    and artist updated_at maxima, the total and upcoming show counts, and
+    the start of the most recent show that has already begun (the last
+    time a show moved from upcoming to past).
+    """
+    return _page_version(Venue, Show.venue_id, Artist, Show.artist_id, venue_id)
+
+
+def artist_page_version(artist_id):
+    """Like venue_page_version, for show_artist.html."""
+    return _page_version(Artist, Show.artist_id, Venue, Show.venue_id, artist_id)
@@ -0,0 +1,61 @@
+import time
+
+from flask import g, has_request_context, request, session
+from flask_sqlalchemy import SQLAlchemy, SignallingSession, get_state
+from sqlalchemy import event, orm
+
+
+REPLICA_BIND = 'replica'
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+#----------------------------------------------------------------------------#
+# Read-replica routing.
+#----------------------------------------------------------------------------#
+
+def reads_from_replica(app):
+    """Whether statements in the current context may go to the replica.
+
+    Only GET/HEAD requests read from the replica, and only when no write
+    happened recently in this browser session (read-your-writes) or earlier
+    in the same request.
+    """
+    if not has_request_context() or request.method not in SAFE_METHODS:
+        return False
+    if REPLICA_BIND not in (app.config.get('SQLALCHEMY_BINDS') or {}):
+        return False
+    if g.get('wrote_primary'):
+        return False
+    return session.get('_primary_until', 0) <= time.time()
+
+
+class RoutingSession(SignallingSession):
+    """Session that sends safe, read-only requests to the replica bind."""
+
+    def get_bind(self, mapper=None, clause=None):
+        if (not self._flushing and not getattr(clause, 'is_dml', False)
+                and reads_from_replica(self.app)):
+            return get_state(self.app).db.get_engine(self.app, bind=REPLICA_BIND)
+        return super().get_bind(mapper, clause)
+
+
+class RoutingSQLAlchemy(SQLAlchemy):
+
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _remember_write(session):
+    if has_request_context():
+        g.wrote_primary = True
+
+
+def init_app(app):
+    """Keep a browser on the primary for READ_YOUR_WRITES_SECONDS after a write."""
+
+    @app.after_request
+    def stick_to_primary(response):
+        if g.get('wrote_primary'):
+            session['_primary_until'] = time.time() + app.config['READ_YOUR_WRITES_SECONDS']
+        return response
@@ -0,0 +1,207 @@
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+
+from forms import VenueForm
+from models import db, DEFAULT_SHOW_MINUTES, Venue, Artist, Show
+from partitions import ensure_partitions
+from queries import reconcile_upcoming_show_counts
+from show_stats import refresh_show_stats
+
+
+# (city, state, relative weight): a few large markets and a long tail.
+CITIES = [
+    ('New York', 'NY', 30), ('Los Angeles', 'CA', 24), ('Chicago', 'IL', 16),
+    ('San Francisco', 'CA', 12), ('Austin', 'TX', 11), ('Nashville', 'TN', 10),
+    ('Seattle', 'WA', 9), ('Atlanta', 'GA', 8), ('New Orleans', 'LA', 8),
+    ('Denver', 'CO', 6), ('Boston', 'MA', 6), ('Philadelphia', 'PA', 6),
+    ('Portland', 'OR', 5), ('Minneapolis', 'MN', 4), ('Detroit', 'MI', 4),
+    ('Miami', 'FL', 4), ('Phoenix', 'AZ', 3), ('Salt Lake City', 'UT', 2),
+    ('Memphis', 'TN', 2), ('Burlington', 'VT', 1),
+]
+
+GENRES = [value for value, _ in VenueForm.genres.kwargs['choices']]
+# Genre popularity falls off with position in the form's choices, Zipf-like.
+GENRE_WEIGHTS = [1.0 / (rank + 1) for rank in range(len(GENRES))]
+
+ADJECTIVES = ['Blue', 'Golden', 'Velvet', 'Electric', 'Crimson', 'Silver', 'Neon',
+              'Midnight', 'Wild', 'Hollow', 'Broken', 'Lucky', 'Rusty', 'Quiet']
+NOUNS = ['Room', 'Hall', 'Tavern', 'Lounge', 'Garage', 'Cellar', 'Owl', 'Fox',
+         'Harbor', 'Lantern', 'Engine', 'Orchard', 'Parlor', 'Station']
+ARTIST_NOUNS = ['Wolves', 'Riders', 'Sisters', 'Collective', 'Brigade', 'Echoes',
+                'Saints', 'Strangers', 'Kings', 'Ghosts', 'Union', 'Machines']
+
+BATCH_ROWS = 10000
+
+
+#----------------------------------------------------------------------------#
+# Row generators.
+#----------------------------------------------------------------------------#
+
+def _genres(rng):
+    return sorted(set(rng.choices(GENRES, GENRE_WEIGHTS, k=rng.randint(1, 3))))
+
+
+def _place(rng):
+    city, state, _ = rng.choices(CITIES, [weight for _, _, weight in CITIES])[0]
+    return city, state
+
+
+def venue_rows(rng, count):
+    for i in range(count):
+        city, state = _place(rng)
+        yield {
+            'name': f"The {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {i}",
+            'city': city,
+            'state': state,
+            'address': f"{rng.randint(1, 9999)} {rng.choice(NOUNS)} St",
+            'phone': rng.randint(2000000, 9999999),
+            'image_link': f"https://picsum.photos/seed/venue{i}/400/300",
+            'facebook_link': f"https://www.facebook.com/venue{i}",
+            'website_link': f"https://venue{i}.example.com",
+            'genres': _genres(rng),
+            'seeking_talent': rng.random() < 0.3,
+            'seeking_description': None,
+        }
+
+
+def artist_rows(rng, count):
+    for i in range(count):
+        city, state = _place(rng)
+        yield {
+            'name': f"{rng.choice(ADJECTIVES)} {rng.choice(ARTIST_NOUNS)} {i}",
+            'city': city,
+            'state': state,
+            'phone': rng.randint(2000000, 9999999),
+            'image_link': f"https://picsum.photos/seed/artist{i}/400/300",
+            'facebook_link': f"https://www.facebook.com/artist{i}",
+            'website_link': None,
+            'genres': _genres(rng),
+            'seeking_venue': rng.random() < 0.4,
+            'seeking_description': None,
+        }
+
+
+def _pick(rng, ids):
+    """Half the picks follow a Pareto curve over ids, half are uniform."""
+    if rng.random() < 0.5:
+        return ids[min(int(rng.paretovariate(1.2)) - 1, len(ids) - 1)]
+    return ids[rng.randrange(len(ids))]
+
+
+# Seeded shows sit on a grid of default-length slots starting at midnight,
+# so two of them either share a slot or do not overlap, and none crosses a
+# month (partition) boundary.
+SLOT = timedelta(minutes=DEFAULT_SHOW_MINUTES)
+SLOTS = 4 * 365 * 24 * 60 // DEFAULT_SHOW_MINUTES
+# Coprime with SLOTS, so k -> (offset + k * SLOT_STRIDE) % SLOTS visits every
+# slot once before repeating.
+SLOT_STRIDE = 7919
+
+
+def show_rows(rng, count, venue_ids, artist_ids, now, booked=None):
+    """Shows spread over the last three years and the next one.
+
+    Popular venues and artists (low ids) get far more shows than the long
+    tail, which is what makes per-entity aggregation expensive. Shows never
+    double-book a venue: the k-th show generated for a venue takes the k-th
+    slot of that venue's own permutation of the grid. `booked` maps each
+    venue to [offset, shows so far] and carries that state between calls,
+    one entry per venue whatever the number of shows. Once every slot of a
+    popular venue is taken its shows go to uniformly picked venues instead.
+    """
+    booked = {} if booked is None else booked
+    start = now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=3 * 365)
+    for _ in range(count):
+        venue_id = _pick(rng, venue_ids)
+        for _ in range(len(venue_ids)):
+            state = booked.setdefault(venue_id, [rng.randrange(SLOTS), 0])
+            if state[1] < SLOTS:
+                break
+            venue_id = venue_ids[rng.randrange(len(venue_ids))]
+        else:
+            return
+        offset, shows = state
+        state[1] += 1
+        yield {
+            'venue_id': venue_id,
+            'artist_id': _pick(rng, artist_ids),
+            'start_time': start + SLOT * ((offset + shows * SLOT_STRIDE) % SLOTS),
+            'duration_minutes': DEFAULT_SHOW_MINUTES,
+        }
+
+
+#----------------------------------------------------------------------------#
+# Loading.
+#----------------------------------------------------------------------------#
+
+def _insert(model, rows, batch_rows, progress=None, skip_conflicts=False):
+    """Insert `rows` in batches of `batch_rows`, one commit per batch.
+
+    With `skip_conflicts`, rows refused by a unique or exclusion constraint
+    (a show double-booking a venue that already has one at that time) are
+    dropped by Postgres instead of failing their batch.
+    """
+    table = model.__table__
+    statement = insert(table).on_conflict_do_nothing() if skip_conflicts else table.insert()
+    batch = []
+    inserted = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_rows:
+            db.session.execute(statement, batch)
+            db.session.commit()
+            inserted += len(batch)
+            batch = []
+            if progress:
+                progress(model.__name__, inserted)
+    if batch:
+        db.session.execute(statement, batch)
+        db.session.commit()
+        inserted += len(batch)
+    if progress:
+        progress(model.__name__, inserted)
+    return inserted
+
+
+def vacuum_analyze():
+    """Merge GIN pending lists and gather planner statistics after a bulk load.
+
+    Until autovacuum gets there, the planner prices the freshly filled GIN
+    indexes out of most plans, which would skew benchmarks and plan checks.
+    """
+    with db.engine.connect() as connection:
+        connection = connection.execution_options(isolation_level='AUTOCOMMIT')
+        connection.execute(text('SET statement_timeout = 0'))
+        try:
+            connection.execute(text('VACUUM ANALYZE'))
+        finally:
+            connection.execute(text('RESET statement_timeout'))
+
+
+def seed(venues=1000, artists=4000, shows=100000, seed=0, batch_rows=BATCH_ROWS, progress=None):
+    """Populate the database with deterministic synthetic data.
+
+    Rows are appended to whatever is already there. The same `seed` always
+    produces the same rows (show times are relative to today), so benchmark
+    runs are comparable across commits.
+    """
+    rng = random.Random(seed)
+    now = datetime.now()
+    _insert(Venue, venue_rows(rng, venues), batch_rows, progress)
+    _insert(Artist, artist_rows(rng, artists), batch_rows, progress)
+
+    venue_ids = [id for id, in db.session.query(Venue.id).order_by(Venue.id)]
+    artist_ids = [id for id, in db.session.query(Artist.id).order_by(Artist.id)]
+    if venue_ids and artist_ids:
+        # Give the seeded history its monthly partitions up front rather than
+        # piling it into the default partition.
+        ensure_partitions(12, since=now - timedelta(days=3 * 365), now=now)
+        # Shows already stored may hold some of the generated slots.
+        _insert(Show, show_rows(rng, shows, venue_ids, artist_ids, now), batch_rows, progress,
+                skip_conflicts=True)
+    reconcile_upcoming_show_counts()
+    refresh_show_stats()
+    vacuum_analyze()
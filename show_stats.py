@@ -0,0 +1,83 @@
+import threading
+import time
+
+from sqlalchemy import text
+
+from dbpool import maintenance_transaction
+from models import db
+
+
+VIEWS = ('venue_show_stats', 'artist_show_stats')
+
+
+#----------------------------------------------------------------------------#
+# Refreshing.
+#----------------------------------------------------------------------------#
+
+def refresh_show_stats():
+    """Recompute both show stats views without blocking readers."""
+    with maintenance_transaction(db.engine) as connection:
+        for view in VIEWS:
+            connection.execute(text(f'REFRESH MATERIALIZED VIEW CONCURRENTLY {view}'))
+
+
+class StatsRefresher:
+    """Refreshes the views in a background thread after show writes.
+
+    Requests arriving while a refresh runs are coalesced into one more
+    refresh, and refreshes start at most once per `min_interval` seconds,
+    so a burst of writes costs at most two refreshes. Per process, like
+    the render cache; `flask refresh-show-stats` from cron covers writes
+    made elsewhere and shows that have since started.
+    """
+
+    def __init__(self, min_interval=10):
+        self.min_interval = min_interval
+        self.refreshes = 0
+        self.failures = 0
+        self._running = False
+        self._pending = False
+        self._last_started = 0.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.min_interval = app.config.get('SHOW_STATS_REFRESH_INTERVAL', self.min_interval)
+
+    def request(self, app):
+        if not app.config.get('SHOW_STATS_BACKGROUND_REFRESH', True):
+            return
+        with self._lock:
+            if self._running:
+                self._pending = True
+                return
+            self._running = True
+        threading.Thread(target=self._run, args=(app,), daemon=True).start()
+
+    def _run(self, app):
+        while True:
+            time.sleep(max(0.0, self._last_started + self.min_interval - time.monotonic()))
+            self._last_started = time.monotonic()
+            try:
+                with app.app_context():
+                    refresh_show_stats()
+                self.refreshes += 1
+            except Exception:
+                self.failures += 1
+                app.logger.exception('Show stats refresh failed')
+            with self._lock:
+                if not self._pending:
+                    self._running = False
+                    return
+                self._pending = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                "refreshes": self.refreshes,
+                "failures": self.failures,
+                "running": self._running,
+                "min_interval": self.min_interval,
+            }
+
+
+stats_refresher = StatsRefresher()
@@ -0,0 +1,107 @@
+from datetime import datetime
+
+from flask import Blueprint, abort, current_app, flash, make_response, render_template, request
+from sqlalchemy.exc import DBAPIError
+
+from cache import render_cache, show_page_keys
+from conditional import make_etag, is_not_modified, add_validators
+from booking import DOUBLE_BOOKED, EXCLUSION_VIOLATION, book_tour, parse_tour_lines
+from forms import ShowForm, TourForm
+from models import db, Show
+from queries import shows_page, bump_upcoming_show_counts
+from show_stats import stats_refresher
+
+
+bp = Blueprint('shows', __name__)
+
+
+#  -----------------------------------------------------------------
+#  Shows
+#  ----------------------------------------------------------------
+
+@bp.route('/shows')
+def shows():
+    limit = request.args.get('limit', current_app.config['SHOWS_PAGE_SIZE'], type=int)
+    limit = max(1, min(limit, current_app.config['SHOWS_PAGE_SIZE_MAX']))
+    upcoming_only = request.args.get('all') != '1'
+    try:
+        data, next_cursor = shows_page(request.args.get('cursor'), limit, upcoming_only)
+    except ValueError:
+        abort(400)
+    # The keyset page is cheap to fetch; the ETag lets us skip rendering it.
+    etag = make_etag('shows', upcoming_only, next_cursor, [tuple(show.values()) for show in data])
+    if is_not_modified(etag):
+        return add_validators(make_response('', 304), etag)
+    return add_validators(make_response(render_template(
+        'pages/shows.html', shows=data, next_cursor=next_cursor, upcoming_only=upcoming_only
+    )), etag)
+
+ 
+@bp.route('/shows/create')
+def create_shows():
+    form = ShowForm()
+    return render_template('forms/new_show.html', form=form)
+
+@bp.route('/shows/create', methods=['POST'])
+def create_show_submission():
+    form = ShowForm(request.form)
+    if form.validate():
+        try:
+            show = Show(
+                artist_id=form.artist_id.data,
+                venue_id=form.venue_id.data,
+                start_time=form.start_time.data,
+                duration_minutes=form.duration_minutes.data
+            )
+            db.session.add(show)
+            if show.start_time > datetime.now():
+                bump_upcoming_show_counts(show.venue_id, show.artist_id)
+            db.session.commit()
+            render_cache.invalidate(*show_page_keys(show.venue_id, show.artist_id))
+            stats_refresher.request(current_app._get_current_object())
+            flash('Show was successfully listed!')
+        except DBAPIError as e:
+            db.session.rollback()
+            if getattr(e.orig, 'pgcode', None) != EXCLUSION_VIOLATION:
+                flash('An error occurred. Show could not be listed.')
+            else:
+                # Let them pick another time without retyping the show.
+                form.start_time.errors.append(DOUBLE_BOOKED)
+                return render_template('forms/new_show.html', form=form), 409
+        except:
+            db.session.rollback()
+            flash('An error occurred. Show could not be listed.')
+        finally:
+            db.session.close()
+    else:
+        print("\n\n", form.errors)
+        flash("Show was not successfully listed.")
+    return render_template('pages/home.html')
+
+
+@bp.route('/shows/tour')
+def create_tour_form():
+    form = TourForm()
+    return render_template('forms/new_tour.html', form=form)
+
+@bp.route('/shows/tour', methods=['POST'])
+def create_tour_submission():
+    form = TourForm(request.form)
+    booked, errors = {}, {}
+    if form.validate():
+        rows = parse_tour_lines(form.shows.data)
+        if len(rows) > current_app.config['TOUR_MAX_SHOWS']:
+            flash(f"A tour can have at most {current_app.config['TOUR_MAX_SHOWS']} shows.")
+        elif not form.artist_id.data.isdigit():
+            errors = {0: ['Artist ID must be a number.']}
+        else:
+            booked, errors = book_tour(int(form.artist_id.data), rows, form.all_or_nothing.data)
+            if booked:
+                flash(f"{len(booked)} shows were successfully listed!")
+            if errors:
+                flash(f"{len(errors)} lines could not be listed." if booked or not form.all_or_nothing.data
+                      else "Nothing was listed: fix the lines below and try again.")
+    else:
+        flash("Tour was not listed successfully.")
+    return render_template('forms/new_tour.html', form=form, booked=booked, errors=errors)
+
@@ -2,3 +2,32 @@ window.parseISOString = function parseISOString(s) {
   var b = s.split(/\D+/);
   return new Date(Date.UTC(b[0], --b[1], b[2], b[3], b[4], b[5], b[6]));
 };
+
+// Suggest artists/venues by name in ID fields marked with data-autocomplete;
+// each option's value is the ID, and its label the name.
+Array.prototype.forEach.call(document.querySelectorAll('[data-autocomplete]'), function (input) {
+  var options = document.getElementById(input.getAttribute('list'));
+  var timer = null;
+  var pending = null;
+  input.addEventListener('input', function () {
+    clearTimeout(timer);
+    if (!input.value || /^\d+$/.test(input.value)) return;
+    timer = setTimeout(function () {
+      if (pending) pending.abort();
+      pending = new XMLHttpRequest();
+      pending.open('GET', input.getAttribute('data-autocomplete') + '?q=' + encodeURIComponent(input.value));
+      pending.onload = function () {
+        if (pending.status !== 200) return;
+        options.innerHTML = '';
+        JSON.parse(pending.responseText).data.forEach(function (match) {
+          var option = document.createElement('option');
+          option.value = match.id;
+          option.label = match.name;
+          option.textContent = match.name;
+          options.appendChild(option);
+        });
+      };
+      pending.send();
+    }, 150);
+  });
+});
@@ -0,0 +1,135 @@
+"""Fixtures for tests that run against a real Postgres.
+
+The suite needs the extensions the migrations create (pg_trgm, btree_gist),
+so there is no SQLite stand-in. Point TEST_DATABASE_URL at a server you can
+create databases on; the database named there is dropped and recreated for
+every run. Without a reachable server the tests are skipped.
+"""
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+
+TEST_DATABASE_URL = os.environ.get('TEST_DATABASE_URL', 'postgresql://postgres@localhost:5432/fyyur_test')
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+# config.py reads the environment at import time.
+os.environ['DATABASE_URL'] = TEST_DATABASE_URL
+os.environ.pop('DATABASE_REPLICA_URL', None)
+
+
+#----------------------------------------------------------------------------#
+# Databases.
+#----------------------------------------------------------------------------#
+
+def recreate_database(url, keep=False):
+    """Drop and create the database in `url`, or with `keep` only create it
+    if missing. Returns whether it was created; skips without a server."""
+    url = make_url(url)
+    admin = create_engine(url.set(database='postgres'), isolation_level='AUTOCOMMIT')
+    try:
+        with admin.connect() as connection:
+            exists = connection.execute(text('SELECT 1 FROM pg_database WHERE datname = :name'),
+                                        {'name': url.database}).scalar()
+            if exists and keep:
+                return False
+            connection.execute(text(f'DROP DATABASE IF EXISTS "{url.database}" WITH (FORCE)'))
+            connection.execute(text(f'CREATE DATABASE "{url.database}"'))
+            return True
+    except OperationalError as error:
+        pytest.skip(f"Postgres is not reachable at {url}: {error.orig}")
+    finally:
+        admin.dispose()
+
+
+def make_app(database_url=TEST_DATABASE_URL):
+    from app import create_app
+
+    app = create_app()
+    app.config.update(
+        TESTING=True,
+        SQLALCHEMY_DATABASE_URI=database_url,
+        WTF_CSRF_ENABLED=False,
+        # Tests refresh the show stats views themselves, not on a timer.
+        SHOW_STATS_BACKGROUND_REFRESH=False,
+    )
+    return app
+
+
+def migrate(app):
+    import flask_migrate
+
+    with app.app_context():
+        flask_migrate.upgrade(directory=MIGRATIONS)
+
+
+@pytest.fixture(scope='session')
+def app():
+    recreate_database(TEST_DATABASE_URL)
+    app = make_app()
+    migrate(app)
+    return app
+
+
+@pytest.fixture
+def db(app):
+    """The extension inside an app context, with empty tables, views and caches."""
+    from cache import render_cache
+    from facets import facet_cache
+    from models import db
+    from show_stats import refresh_show_stats
+
+    with app.app_context():
+        yield db
+        db.session.rollback()
+        db.session.execute(text('TRUNCATE "Venue", "Artist", shows RESTART IDENTITY CASCADE'))
+        db.session.commit()
+        # Ids restart, so counts left in the views would match new rows.
+        refresh_show_stats()
+        render_cache.clear()
+        facet_cache.clear()
+
+
+@pytest.fixture
+def client(app, db):
+    return app.test_client()
+
+
+#----------------------------------------------------------------------------#
+# Rows.
+#----------------------------------------------------------------------------#
+
+def add_venue(db, name='The Blue Room', city='San Francisco', state='CA', genres=('Jazz',), **values):
+    from models import Venue
+
+    venue = Venue(name=name, city=city, state=state, address='1 Main St', phone=5550100,
+                  image_link='https://example.com/venue.png', genres=list(genres),
+                  seeking_talent=False, **values)
+    db.session.add(venue)
+    db.session.commit()
+    return venue
+
+
+def add_artist(db, name='Guns N Petals', city='San Francisco', state='CA', genres=('Rock n Roll',), **values):
+    from models import Artist
+
+    artist = Artist(name=name, city=city, state=state, phone=5550101,
+                    image_link='https://example.com/artist.png', genres=list(genres),
+                    seeking_venue=False, **values)
+    db.session.add(artist)
+    db.session.commit()
+    return artist
+
+
+def add_show(db, venue, artist, start_time=None, duration_minutes=120):
+    """A show, by default one that starts a week from now."""
+    from models import Show
+
+    show = Show(venue_id=venue.id, artist_id=artist.id, duration_minutes=duration_minutes,
+                start_time=start_time or datetime.now() + timedelta(days=7))
+    db.session.add(show)
+    db.session.commit()
+    return show
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from conftest import add_artist, add_show, add_venue
+
+
+def get_with_statements(client, db, path):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(' '.join(statement.split()))
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        response = client.get(path)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    return response, statements
+
+
+def test_detail_fields_select_only_what_was_asked_for(client, db):
+    venue = add_venue(db, name='The Blue Room')
+    artist = add_artist(db, name='Guns N Petals')
+    add_show(db, venue, artist, datetime.now() + timedelta(days=1))
+    add_show(db, venue, artist, datetime.now() - timedelta(days=1))
+
+    response, statements = get_with_statements(client, db, f'/api/v1/venues/{venue.id}?fields=name,city')
+    assert response.json == {'data': {'name': 'The Blue Room', 'city': 'San Francisco'}}
+    assert len(statements) == 1
+    assert 'shows' not in statements[0] and 'address' not in statements[0]
+
+    response, statements = get_with_statements(
+        client, db, f'/api/v1/artists/{artist.id}?fields=upcoming_shows_count,past_shows_count')
+    assert response.json == {'data': {'upcoming_shows_count': 1, 'past_shows_count': 1}}
+    assert len(statements) == 2
+    assert 'GROUP BY' in statements[1] and '"Venue"' not in statements[1]
+
+    response, statements = get_with_statements(client, db, f'/api/v1/venues/{venue.id}?fields=upcoming_shows')
+    assert [show['artist_name'] for show in response.json['data']['upcoming_shows']] == ['Guns N Petals']
+    assert len(statements) == 2
+
+
+def test_detail_without_fields_returns_everything(client, db):
+    venue = add_venue(db)
+    add_show(db, venue, add_artist(db))
+
+    data = client.get(f'/api/v1/venues/{venue.id}').json['data']
+
+    assert set(data) >= {'name', 'website', 'past_shows', 'upcoming_shows', 'upcoming_shows_count'}
+    assert data['upcoming_shows_count'] == 1
+
+
+def test_detail_rejects_unknown_fields_and_missing_rows(client, db):
+    venue = add_venue(db)
+
+    assert client.get(f'/api/v1/venues/{venue.id}?fields=name,password').status_code == 400
+    assert client.get(f'/api/v1/venues/{venue.id + 1}').status_code == 404
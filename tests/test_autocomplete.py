@@ -0,0 +1,46 @@
+from autocomplete import PrefixIndex, name_indexes
+from conftest import add_venue
+
+VENUE_FORM = {'city': 'San Francisco', 'state': 'CA', 'address': '1 Main St', 'phone': '5550100',
+              'genres': 'Jazz', 'image_link': 'https://example.com/venue.png',
+              'facebook_link': 'https://facebook.com/venue'}
+
+
+def names(client, prefix):
+    return [venue['name'] for venue in client.get(f'/api/v1/autocomplete/venues?q={prefix}').json['data']]
+
+
+def test_an_edited_name_stops_matching_its_old_prefix(client, db, monkeypatch):
+    from models import Venue
+
+    monkeypatch.setitem(name_indexes, 'venues', PrefixIndex(Venue))
+    venue = add_venue(db, name='The Blue Room')
+    add_venue(db, name='Blue Note')
+    assert names(client, 'blue') == ['Blue Note', 'The Blue Room']
+
+    client.post(f'/venues/{venue.id}/edit', data=dict(VENUE_FORM, name='The Green Room'))
+
+    assert names(client, 'blue') == ['Blue Note']
+    assert names(client, 'gree') == ['The Green Room']
+    assert names(client, 'the') == ['The Green Room']
+
+
+def test_batched_edits_match_a_fresh_load():
+    names = {id: f'Venue {id} Hall' for id in range(1, 50)}
+    index = PrefixIndex(None)
+    index.load(names.items())
+    index.PENDING_LIMIT = 10
+
+    for id in range(1, 20):
+        names[id] = f'Renamed {id}'
+        index.add(id, names[id])
+        if id % 3 == 0:
+            del names[id]
+            index.remove(id)
+    fresh = PrefixIndex(None)
+    fresh.load(names.items())
+
+    for prefix in ('venue', 'venue 1', 'hall', 'renamed', 'renamed 1'):
+        assert index.search(prefix, 100) == fresh.search(prefix, 100)
+    index._merge_pending()
+    assert (index._keys, index._ids) == (fresh._keys, fresh._ids)
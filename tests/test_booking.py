@@ -0,0 +1,52 @@
+from datetime import datetime
+
+import pytest
+
+from booking import parse_tour_row
+from conftest import add_artist, add_venue
+
+
+def test_parses_a_row():
+    assert parse_tour_row(1, '2', ' 2026-11-01T20:00', '90') == (
+        1, {'venue_id': 2, 'start_time': datetime(2026, 11, 1, 20), 'duration_minutes': 90}, None)
+    assert parse_tour_row(2, 2, '2026-11-01 20:00') == (
+        2, {'venue_id': 2, 'start_time': datetime(2026, 11, 1, 20)}, None)
+
+
+@pytest.mark.parametrize('venue_id', [True, 2.0, 2.5, '2.5', None])
+def test_venue_ids_must_be_whole_numbers(venue_id):
+    assert parse_tour_row(1, venue_id, '2026-11-01T20:00')[2] == [
+        'Expected a venue id and a YYYY-MM-DD HH:MM start time.']
+
+
+@pytest.mark.parametrize('duration_minutes', [True, 90.5, 0, 24 * 60 + 1])
+def test_durations_must_be_whole_minutes_in_range(duration_minutes):
+    assert parse_tour_row(1, 2, '2026-11-01T20:00', duration_minutes)[2] == [
+        'Expected a duration of 1 to 1440 minutes.']
+
+
+def test_start_times_with_a_utc_offset_are_refused():
+    assert parse_tour_row(1, 2, '2026-11-01T20:00+01:00')[2] == [
+        'Expected a local start time without a UTC offset.']
+
+
+def test_api_reports_bad_rows_per_row(client, db):
+    venue = add_venue(db)
+    artist = add_artist(db)
+
+    response = client.post('/api/v1/tours', json={'artist_id': artist.id, 'shows': [
+        {'venue_id': venue.id, 'start_time': '2026-11-01T20:00+01:00'},
+        {'venue_id': True, 'start_time': '2026-11-02T20:00'},
+    ]})
+
+    assert response.status_code == 422
+    assert response.json == {'booked': {}, 'errors': {
+        '1': ['Expected a local start time without a UTC offset.'],
+        '2': ['Expected a venue id and a YYYY-MM-DD HH:MM start time.'],
+    }}
+
+
+def test_api_refuses_a_boolean_artist_id(client, db):
+    response = client.post('/api/v1/tours', json={'artist_id': True, 'shows': []})
+
+    assert response.status_code == 400
@@ -0,0 +1,39 @@
+from sqlalchemy import create_engine, text
+
+from conftest import TEST_DATABASE_URL
+
+
+def pgbouncer_app(timeout_ms):
+    import config
+    from app import create_app
+
+    settings = type('Settings', (), {name: getattr(config, name) for name in dir(config) if name.isupper()})
+    settings.SQLALCHEMY_DATABASE_URI = TEST_DATABASE_URL
+    settings.DB_PGBOUNCER = True
+    settings.DB_STATEMENT_TIMEOUT_MS = timeout_ms
+    settings.TESTING = True
+    return create_app(settings)
+
+
+def statement_timeout(app):
+    from models import db
+
+    with app.app_context():
+        try:
+            return db.session.execute(text('SHOW statement_timeout')).scalar()
+        finally:
+            db.session.rollback()
+
+
+def test_each_app_sets_its_own_timeout_on_its_own_engines(app):
+    first, second = pgbouncer_app(1234), pgbouncer_app(4321)
+
+    assert statement_timeout(first) == '1234ms'
+    assert statement_timeout(second) == '4321ms'
+
+    other = create_engine(TEST_DATABASE_URL)
+    try:
+        with other.begin() as connection:
+            assert connection.execute(text('SHOW statement_timeout')).scalar() == '0'
+    finally:
+        other.dispose()
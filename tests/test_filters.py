@@ -0,0 +1,23 @@
+from datetime import datetime
+
+import babel.dates
+
+from filters import format_datetime
+
+SHOW_TIME = datetime(2026, 11, 1, 20, 30)
+
+
+def test_app_formats():
+    assert format_datetime(SHOW_TIME, 'full') == 'Sunday November, 1, 2026 at 8:30PM'
+    assert format_datetime(SHOW_TIME, 'medium') == 'Sun 11, 01, 2026 8:30PM'
+    assert format_datetime(SHOW_TIME) == format_datetime(SHOW_TIME, 'medium')
+
+
+def test_babel_standard_formats_pass_through():
+    for format in ('short', 'long'):
+        assert format_datetime(SHOW_TIME, format) == babel.dates.format_datetime(SHOW_TIME, format, locale='en')
+    assert format_datetime(SHOW_TIME, 'short') == '11/1/26, 8:30 PM'
+
+
+def test_raw_patterns():
+    assert format_datetime(SHOW_TIME, 'yyyy-MM-dd HH:mm') == '2026-11-01 20:30'
@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy import event, text
+
+from genres import GenreTable
+
+
+@pytest.fixture
+def genres(db):
+    """The genre rows, restored after the test, and a fresh table copy."""
+    rows = db.session.execute(text('SELECT id, name FROM genre')).all()
+    yield GenreTable()
+    db.session.rollback()
+    db.session.execute(text('DELETE FROM genre'))
+    db.session.execute(text('INSERT INTO genre (id, name) VALUES (:id, :name)'),
+                       [{'id': id, 'name': name} for id, name in rows])
+    db.session.commit()
+
+
+def statements_run(db, call):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        call()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    return len(statements)
+
+
+def test_ids_reload_once_for_a_genre_added_since_the_load(db, genres):
+    assert genres.ids(['Jazz']) == genres.ids(['Jazz'])
+    genre_id = db.session.execute(text(
+        "INSERT INTO genre (id, name) SELECT max(id) + 1, 'Zydeco' FROM genre RETURNING id")).scalar()
+    db.session.commit()
+
+    assert genres.ids(['Jazz', 'Zydeco'])[1] == genre_id
+    assert genres.names([genre_id]) == ['Zydeco']
+    with pytest.raises(ValueError, match='Polka'):
+        genres.ids(['Polka'])
+
+
+def test_an_empty_table_is_loaded_once(db, genres):
+    db.session.execute(text('DELETE FROM genre'))
+    db.session.commit()
+
+    assert statements_run(db, lambda: 'Jazz' in genres) == 1
+    assert statements_run(db, lambda: 'Jazz' in genres) == 0
@@ -0,0 +1,33 @@
+import json
+
+from conftest import add_artist, add_venue
+
+
+def import_rows(app, tmp_path, entity, rows):
+    import importer
+
+    path = tmp_path / f'{entity}.ndjson'
+    path.write_text(''.join(json.dumps(row) + '\n' for row in rows))
+    rejected = {}
+    with app.test_request_context():
+        loaded, _ = importer.import_file(entity, str(path), reject=rejected.__setitem__)
+    return loaded, rejected
+
+
+def test_a_show_without_a_start_time_is_rejected(app, db, tmp_path):
+    from models import Show
+
+    venue = add_venue(db)
+    artist = add_artist(db)
+    show = {'venue_id': venue.id, 'artist_id': artist.id}
+
+    loaded, rejected = import_rows(app, tmp_path, 'shows', [
+        show,
+        dict(show, start_time=''),
+        dict(show, start_time='2026-11-01 20:00:00'),
+    ])
+
+    assert loaded == 1
+    assert rejected == {1: {'start_time': ['This field is required.']},
+                        2: {'start_time': ['This field is required.']}}
+    assert [str(start) for start, in db.session.query(Show.start_time)] == ['2026-11-01 20:00:00']
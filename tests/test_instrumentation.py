@@ -0,0 +1,41 @@
+import pytest
+
+from conftest import make_app
+
+
+@pytest.fixture
+def failing_app(app):
+    failing = make_app()
+    failing.config['SLOW_REQUEST_MS'] = 0
+    # As in production: DEBUG would keep the context, and defer its
+    # teardown, for the debugger.
+    failing.config['PRESERVE_CONTEXT_ON_EXCEPTION'] = False
+
+    @failing.route('/fails')
+    def fails():
+        raise RuntimeError('boom')
+
+    return failing
+
+
+def test_an_unhandled_exception_is_timed_and_logged(failing_app, caplog):
+    from instrumentation import metrics
+
+    before = metrics.requests['fails']
+    with pytest.raises(RuntimeError):
+        failing_app.test_client().get('/fails')
+
+    assert metrics.requests['fails'] == before + 1
+    assert 'fyyur_request_seconds_count{endpoint="fails"}' in metrics.exposition()
+    assert any('Slow request: GET /fails endpoint=fails status=500' in message for message in caplog.messages)
+
+
+def test_the_error_page_is_timed_with_its_status(failing_app, caplog):
+    from instrumentation import metrics
+
+    failing_app.config['PROPAGATE_EXCEPTIONS'] = False
+    before = metrics.requests['fails']
+
+    assert failing_app.test_client().get('/fails').status_code == 500
+    assert metrics.requests['fails'] == before + 1
+    assert any('endpoint=fails status=500' in message for message in caplog.messages)
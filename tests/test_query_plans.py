@@ -0,0 +1,75 @@
+"""Query-plan regression tests.
+
+Plans depend on data volume, so these run against their own database,
+seeded at a realistic size with seed.py and planned with default settings.
+Seeding takes a minute or two; the database is kept between runs and only
+reseeded when it is missing or holds a different amount of data.
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, text
+from sqlalchemy.engine import make_url
+
+from conftest import TEST_DATABASE_URL, make_app, migrate, recreate_database
+
+VENUES, ARTISTS, SHOWS = 5000, 20000, 600000
+
+
+def seeded_counts():
+    from models import db, Venue, Artist, Show
+
+    return tuple(db.session.query(func.count(model.id)).scalar() for model in (Venue, Artist, Show))
+
+
+@pytest.fixture(scope='module')
+def seeded_app():
+    from models import db
+    from seed import seed
+
+    url = make_url(TEST_DATABASE_URL)
+    url = url.set(database=f'{url.database}_plans').render_as_string(hide_password=False)
+    recreate_database(url, keep=True)
+    app = make_app(url)
+    migrate(app)
+    with app.app_context():
+        if seeded_counts() != (VENUES, ARTISTS, SHOWS):
+            db.session.remove()
+            db.engine.dispose()
+            recreate_database(url)
+            migrate(app)
+            seed(venues=VENUES, artists=ARTISTS, shows=SHOWS)
+        db.session.remove()
+    return app
+
+
+def test_seeded_relations_are_big_enough_to_check(seeded_app):
+    # Below MIN_PAGES a seq scan is allowed, so smaller data would let
+    # every check pass.
+    from models import db
+    from partitions import month_start, partition_name
+    from plancheck import MIN_PAGES
+
+    relations = ['Venue', 'Artist', partition_name(month_start(datetime.now()))]
+    with seeded_app.app_context():
+        pages = dict(db.session.execute(text(
+            'SELECT relname, relpages FROM pg_class WHERE relname = ANY(:names)'
+        ), {'names': relations}).all())
+    assert all(pages.get(name, 0) >= MIN_PAGES for name in relations), pages
+
+
+def test_unindexed_filters_are_reported(seeded_app):
+    from plancheck import explain
+
+    with seeded_app.app_context():
+        assert explain('SELECT id FROM shows WHERE duration_minutes = %(minutes)s', {'minutes': 90}) == {'shows'}
+        assert explain('SELECT id FROM "Venue" WHERE phone = %(phone)s', {'phone': 5550100}) == {'Venue'}
+
+
+def test_read_routes_do_not_seq_scan(seeded_app):
+    from plancheck import check_query_plans
+
+    failures = check_query_plans(seeded_app)
+    assert not failures, '\n'.join(
+        f"{path}: sequential scan on {relation}\n    {' '.join(statement.split())}"
+        for path, relation, statement in failures)
@@ -0,0 +1,49 @@
+import cache
+from cache import RenderCache
+
+from conftest import add_artist, add_show, add_venue, make_app
+
+
+def test_a_worker_without_the_invalidation_renders_the_new_version(app, db, monkeypatch):
+    """Two workers, each with its own render cache; only the one that took
+    the write drops its copy of the page."""
+    from models import Venue
+
+    other_cache = RenderCache()
+    other_worker = make_app()
+    venue = add_venue(db, name='The Blue Room')
+    add_show(db, venue, add_artist(db))
+    venue_id = venue.id
+
+    def get(worker_app, worker_cache):
+        with monkeypatch.context() as patch:
+            patch.setattr(cache, 'render_cache', worker_cache)
+            return worker_app.test_client().get(f'/venues/{venue_id}')
+
+    first = get(other_worker, other_cache)
+    assert get(other_worker, other_cache).headers['X-Render-Cache'] == 'hit'
+
+    # Both apps share the thread's scoped session, which the requests remove.
+    Venue.query.get(venue_id).name = 'The Green Room'
+    db.session.commit()
+    cache.render_cache.invalidate(*cache.venue_page_keys(venue_id))
+
+    second = get(other_worker, other_cache)
+    assert second.headers['ETag'] != first.headers['ETag']
+    assert second.headers['X-Render-Cache'] == 'miss'
+    assert 'The Green Room' in second.get_data(as_text=True)
+
+
+def test_invalidating_a_page_drops_every_cached_version():
+    render_cache = RenderCache()
+    render_cache.set(('venue', 1, 'old'), 'old page')
+    render_cache.set(('venue', 1, 'new'), 'new page')
+    render_cache.set(('venue', 12, 'new'), 'other venue')
+    render_cache.set(('artist', 1, 'new'), 'artist page')
+
+    render_cache.invalidate(('venue', 1))
+
+    assert render_cache.get(('venue', 1, 'old')) is None
+    assert render_cache.get(('venue', 1, 'new')) is None
+    assert render_cache.get(('venue', 12, 'new')) == 'other venue'
+    assert render_cache.get(('artist', 1, 'new')) == 'artist page'
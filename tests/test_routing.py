@@ -0,0 +1,124 @@
+"""Read-replica routing, against a second database standing in for the replica.
+
+The replica gets the same schema but its own copy of the rows, with a
+different venue name, so both the statements and the pages show which
+database answered.
+"""
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session
+
+from conftest import TEST_DATABASE_URL, add_venue, make_app, migrate, recreate_database
+
+REPLICA_URL = make_url(TEST_DATABASE_URL)
+REPLICA_URL = REPLICA_URL.set(database=f'{REPLICA_URL.database}_replica').render_as_string(hide_password=False)
+PRIMARY, REPLICA = make_url(TEST_DATABASE_URL).database, make_url(REPLICA_URL).database
+
+VENUE_FORM = {'name': 'The Green Room', 'city': 'San Francisco', 'state': 'CA', 'address': '1 Main St',
+              'phone': '5550100', 'genres': 'Jazz', 'image_link': 'https://example.com/venue.png',
+              'facebook_link': 'https://facebook.com/thegreenroom'}
+
+
+@pytest.fixture(scope='module')
+def replicated_app(app):
+    """An app whose SQLALCHEMY_BINDS has a replica; the primary is `app`'s database."""
+    recreate_database(REPLICA_URL)
+    migrate(make_app(REPLICA_URL))
+    replicated = make_app()
+    replicated.config['SQLALCHEMY_BINDS'] = {'replica': REPLICA_URL}
+    return replicated
+
+
+@pytest.fixture
+def venue_id(replicated_app):
+    """One venue, named after the database it is stored in."""
+    from models import db
+
+    # No app context stays pushed during the test: requests would share its g.
+    with replicated_app.app_context():
+        for bind, name in ((None, 'Primary Hall'), ('replica', 'Replica Hall')):
+            with Session(db.get_engine(bind=bind)) as session:
+                venue_id = add_venue(SimpleNamespace(session=session), name=name).id
+    yield venue_id
+    with replicated_app.app_context():
+        for bind in (None, 'replica'):
+            with db.get_engine(bind=bind).begin() as connection:
+                connection.execute(text('TRUNCATE "Venue", "Artist", shows RESTART IDENTITY CASCADE'))
+
+
+@contextmanager
+def databases_used():
+    """The database each statement ran on, in order."""
+    used = []
+
+    def record(conn, cursor, statement, *args):
+        used.append(conn.engine.url.database)
+
+    event.listen(Engine, 'before_cursor_execute', record)
+    try:
+        yield used
+    finally:
+        event.remove(Engine, 'before_cursor_execute', record)
+
+
+def test_gets_read_from_the_replica_and_posts_write_to_the_primary(replicated_app, venue_id):
+    client = replicated_app.test_client()
+
+    with databases_used() as used:
+        response = client.get(f'/api/v1/venues/{venue_id}?fields=name')
+    assert response.json == {'data': {'name': 'Replica Hall'}}
+    assert set(used) == {REPLICA}
+
+    with databases_used() as used:
+        response = client.post(f'/venues/{venue_id}/edit', data=VENUE_FORM)
+    assert response.status_code == 302
+    assert used and set(used) == {PRIMARY}
+
+
+def test_a_write_pins_the_rest_of_the_request_to_the_primary(replicated_app, venue_id):
+    from models import db, Venue
+
+    with replicated_app.test_request_context(method='GET'), databases_used() as used:
+        venue = db.session.get(Venue, venue_id)
+        assert venue.name == 'Replica Hall'
+        assert used == [REPLICA]
+
+        venue.name = 'The Green Room'
+        db.session.commit()
+
+        assert db.session.get(Venue, venue_id).name == 'The Green Room'
+        assert used[1:] == [PRIMARY, PRIMARY]
+
+
+def test_the_redirect_after_a_write_reads_from_the_primary(replicated_app, venue_id, monkeypatch):
+    import routing
+    from time import time
+
+    client = replicated_app.test_client()
+    with databases_used() as used:
+        response = client.post(f'/venues/{venue_id}/edit', data=VENUE_FORM, follow_redirects=True)
+    assert 'The Green Room' in response.get_data(as_text=True)
+    assert set(used) == {PRIMARY}
+
+    # The session cookie keeps this browser on the primary until the window ends.
+    window = replicated_app.config['READ_YOUR_WRITES_SECONDS']
+    now = time()
+    monkeypatch.setattr(routing, 'time', SimpleNamespace(time=lambda: now + window - 1))
+    with databases_used() as used:
+        client.get(f'/api/v1/venues/{venue_id}?fields=name')
+    assert set(used) == {PRIMARY}
+
+    monkeypatch.setattr(routing, 'time', SimpleNamespace(time=lambda: now + window + 1))
+    with databases_used() as used:
+        response = client.get(f'/api/v1/venues/{venue_id}?fields=name')
+    assert response.json == {'data': {'name': 'Replica Hall'}}
+    assert set(used) == {REPLICA}
+
+    # Another browser never wrote, so it reads from the replica throughout.
+    with databases_used() as used:
+        replicated_app.test_client().get(f'/venues/{venue_id}')
+    assert set(used) == {REPLICA}
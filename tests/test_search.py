@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from conftest import add_artist, add_show, add_venue
+
+
+def search_venues(term, limit=50):
+    from models import Venue
+    from queries import search
+
+    return search(Venue, term, limit)
+
+
+def names(results):
+    return [hit['name'] for hit in results['data']]
+
+
+def test_name_matches_rank_above_other_fields(db):
+    add_venue(db, name='Quiet Cellar', genres=['Jazz'])
+    add_venue(db, name='Jazz Room')
+    add_venue(db, name='The Jazz Standard')
+    add_venue(db, name='Crimson Hall', genres=['Rock n Roll'])
+
+    results = search_venues('jazz room')
+
+    assert names(results) == ['Jazz Room']
+    assert names(search_venues('jazz'))[:2] == ['Jazz Room', 'The Jazz Standard']
+    assert names(search_venues('jazz'))[-1] == 'Quiet Cellar'
+
+
+def test_matches_substrings_of_names_and_words_in_city_and_genres(db):
+    add_venue(db, name='The Musical Hop')
+    add_venue(db, name='Park Square Live', city='New Orleans', state='LA')
+    add_venue(db, name='Crimson Hall', genres=['Blues'])
+    add_venue(db, name='Unrelated', city='Boston', state='MA', genres=['Folk'])
+
+    assert names(search_venues('hop')) == ['The Musical Hop']
+    assert names(search_venues('orleans')) == ['Park Square Live']
+    assert names(search_venues('blues')) == ['Crimson Hall']
+    assert search_venues('zzzz') == {'count': 0, 'data': []}
+
+
+def test_like_wildcards_in_the_term_are_literal(db):
+    add_venue(db, name='100% Jazz')
+    add_venue(db, name='Cellar_Bar')
+    add_venue(db, name='Cellar Bar')
+
+    assert names(search_venues('%')) == ['100% Jazz']
+    assert names(search_venues('_')) == ['Cellar_Bar']
+
+
+def test_results_are_capped(db, app):
+    for number in range(12):
+        add_venue(db, name=f'Blue Room {number}')
+
+    assert search_venues('blue', limit=5)['count'] == 5
+    assert len(search_venues('blue', limit=5)['data']) == 5
+
+    app.config['SEARCH_RESULT_LIMIT'] = 3
+    try:
+        html = app.test_client().post('/venues/search', data={'search_term': 'blue'}).get_data(as_text=True)
+    finally:
+        app.config['SEARCH_RESULT_LIMIT'] = 50
+    assert html.count('Blue Room ') == 3
+
+
+def test_upcoming_show_counts_come_from_one_batched_query(db):
+    from queries import reconcile_upcoming_show_counts
+
+    artist = add_artist(db)
+    venues = [add_venue(db, name=f'Blue Room {number}') for number in range(10)]
+    for number, venue in enumerate(venues):
+        for day in range(number % 3):
+            add_show(db, venue, artist, datetime.now() + timedelta(days=day + 1))
+        add_show(db, venue, artist, datetime.now() - timedelta(days=30))
+    reconcile_upcoming_show_counts()
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        many = search_venues('blue')
+        executed_for_many = len(statements)
+        statements.clear()
+        one = search_venues('blue room 4')
+        executed_for_one = len(statements)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+    assert many['count'] == 10
+    assert {hit['name']: hit['num_upcoming_shows'] for hit in many['data']} == {
+        f'Blue Room {number}': number % 3 for number in range(10)}
+    assert one['data'][0]['num_upcoming_shows'] == 1
+    assert executed_for_many == executed_for_one == 1
+
+
+def test_upcoming_show_counts_fall_back_to_the_counter_when_the_view_is_stale(db):
+    from models import Venue
+    from queries import search
+    from show_stats import refresh_show_stats
+
+    venue = add_venue(db, name='Blue Room')
+    add_show(db, venue, add_artist(db))
+    refresh_show_stats()
+    db.session.query(Venue).update({Venue.upcoming_shows_count: 7})
+    db.session.commit()
+
+    assert search_venues('blue')['data'][0]['num_upcoming_shows'] == 1
+    assert search(Venue, 'blue', max_stats_age=0)['data'][0]['num_upcoming_shows'] == 7
+
+
+def test_reconciling_counters_counts_only_upcoming_shows(db):
+    from models import Artist, Venue
+    from queries import reconcile_upcoming_show_counts
+
+    busy, quiet, empty = (add_venue(db, name=name) for name in ('Busy', 'Quiet', 'Empty'))
+    headliner, opener = add_artist(db, name='Headliner'), add_artist(db, name='Opener')
+    for day in range(3):
+        add_show(db, busy, headliner, datetime.now() + timedelta(days=day + 1))
+    add_show(db, quiet, opener, datetime.now() + timedelta(days=1))
+    add_show(db, quiet, headliner, datetime.now() - timedelta(days=1))
+    db.session.query(Venue).update({Venue.upcoming_shows_count: 5})
+    db.session.query(Artist).update({Artist.upcoming_shows_count: 5})
+    db.session.commit()
+
+    assert reconcile_upcoming_show_counts() == 5
+    assert dict(db.session.query(Venue.name, Venue.upcoming_shows_count)) == {
+        'Busy': 3, 'Quiet': 1, 'Empty': 0}
+    assert dict(db.session.query(Artist.name, Artist.upcoming_shows_count)) == {
+        'Headliner': 3, 'Opener': 1}
+    assert reconcile_upcoming_show_counts() == 0
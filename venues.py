@@ -0,0 +1,182 @@
+import sys
+
+from flask import Blueprint, abort, current_app, flash, make_response, redirect, render_template, request, url_for
+
+from autocomplete import name_indexes
+from cache import render_cache, cached_render, venue_page_keys
+from conditional import make_etag, last_modified_from, is_not_modified, add_validators
+from facets import facet_links, selected_genres
+from forms import VenueForm
+from models import db, Venue
+from show_stats import stats_refresher
+from queries import venue_areas, venue_detail, search, delete_venue_shows, venue_page_version
+
+
+bp = Blueprint('venues', __name__)
+
+
+#  ----------------------------------------------------------------
+#  Venues
+#  ----------------------------------------------------------------
+
+@bp.route('/venues')
+def venues():
+    genres = selected_genres()
+    areas = venue_areas(current_app.config['SHOW_STATS_MAX_AGE'], genres)
+    facets = facet_links('venues.venues', Venue, genres)
+    return render_template('pages/venues.html', areas=areas, facets=facets)
+  
+ 
+@bp.route('/venues/search', methods=['POST'])
+def search_venues():
+    search_term = request.form.get("search_term", "")
+    response = search(Venue, search_term, current_app.config['SEARCH_RESULT_LIMIT'],
+                      current_app.config['SHOW_STATS_MAX_AGE'])
+    return render_template('pages/search_venues.html', results=response, search_term=search_term)
+     
+@bp.route('/venues/<int:venue_id>')
+def show_venue(venue_id):
+    version = venue_page_version(venue_id)
+    if version is None:
+        abort(404)
+    etag = make_etag('venue', venue_id, version)
+    last_modified = last_modified_from(version)
+    if is_not_modified(etag, last_modified):
+        return add_validators(make_response('', 304), etag, last_modified)
+
+    def render():
+        data = venue_detail(venue_id)
+        if data is None:
+            abort(404)
+        return render_template('pages/show_venue.html', venue=data)
+
+    html, cache_status = cached_render(('venue', venue_id, etag), render)
+    response = make_response(html)
+    response.headers['X-Render-Cache'] = cache_status
+    return add_validators(response, etag, last_modified)
+
+
+#  ----------------------------------------------------------------
+#  Create Venue
+#  ----------------------------------------------------------------
+
+
+@bp.route('/venues/create', methods=['GET'])
+def create_venue_form():
+  form = VenueForm()
+  return render_template('forms/new_venue.html', form=form)
+
+
+@bp.route('/venues/create', methods=['POST'])
+def create_venue_submission():
+    form = VenueForm(request.form)
+    
+    if form.validate():
+        try:
+            venue = Venue(
+                name=form.name.data,
+                city=form.city.data,
+                state=form.state.data,
+                address=form.address.data,
+                phone=form.phone.data,
+                genres=form.genres.data,
+                facebook_link=form.facebook_link.data,
+                image_link=form.image_link.data,
+                website_link=form.website_link.data,
+                seeking_talent=form.seeking_talent.data,
+                seeking_description=form.seeking_description.data
+        )
+            db.session.add(venue)
+            db.session.commit()
+            name_indexes['venues'].add(venue.id, venue.name)
+            flash('Venue ' + request.form['name'] + ' was successfully listed!')
+        except:
+            db.session.rollback()
+            print(sys.exc_info)
+            flash('An error occurred. Venue ' + request.form['name'] + ' could not be listed.')
+        finally:
+            db.session.close()
+            
+    else:
+        print("\n\n", form.errors)
+        flash("Venue was not listed successfully.")
+            
+    return render_template('pages/home.html')
+  
+###BONUS CHALLENGE: DELETE BUTTON======================================
+@bp.route('/venues/<venue_id>/delete', methods=['DELETE'])
+def delete_venue(venue_id):
+    try:
+        venue = Venue.query.get(venue_id)
+        stale_pages = venue_page_keys(venue.id)
+        delete_venue_shows(venue.id)
+        db.session.delete(venue)
+        db.session.commit()
+        render_cache.invalidate(*stale_pages)
+        stats_refresher.request(current_app._get_current_object())
+        name_indexes['venues'].remove(venue.id)
+        flash('Venue ' + venue.name + ' was successfully deleted!.')
+    except:
+        db.session.rollback()
+        flash('Venue ' + venue.name + ' could be not deleted.')
+    finally:
+        db.session.close()
+    
+    return redirect(url_for('index'))
+ 
+
+@bp.route('/venues/<int:venue_id>/edit', methods=['GET'])
+def edit_venue(venue_id):
+    form = VenueForm()
+    data = Venue.query.get(venue_id)
+    venue ={
+            "id": data.id,
+            "name": data.name,
+            "genres": data.genres,
+            "address": data.address,
+            "city": data.city,
+            "state": data.state,
+            "phone": data.phone,
+            "website": data.website_link,
+            "facebook_link": data.facebook_link,
+            "seeking_talent": data.seeking_talent,
+            "seeking_description": data.seeking_description,
+            "image_link": data.image_link,
+        }
+
+    return render_template('forms/edit_venue.html', form=form, venue=venue)
+
+ 
+@bp.route('/venues/<int:venue_id>/edit', methods=['POST'])
+def edit_venue_submission(venue_id):
+    form = VenueForm(request.form)
+    if form.validate():
+        try:
+            venue = Venue.query.get(venue_id)
+            venue.name = form.name.data
+            venue.city=form.city.data
+            venue.state=form.state.data
+            venue.address=form.address.data
+            venue.phone=form.phone.data
+            venue.genres=form.genres.data
+            venue.facebook_link=form.facebook_link.data
+            venue.image_link=form.image_link.data
+            venue.seeking_talent=form.seeking_talent.data
+            venue.seeking_description=form.seeking_description.data
+            venue.website_link=form.website_link.data
+            db.session.add(venue)
+            db.session.commit()
+            render_cache.invalidate(*venue_page_keys(venue_id))
+            name_indexes['venues'].add(venue.id, venue.name)
+            flash('Venue '+ venue.name + ' was successfully edited!')
+        except:
+            db.session.rollback()
+            flash('Venue '+ venue.name + ' could not be edited!')
+
+        finally:
+            db.session.close()
+    else:
+        print("\n\n", form.errors)
+        flash("Venue was not edited successfully.")
+            
+    return redirect(url_for('venues.show_venue', venue_id=venue_id))